@@ -1,44 +1,69 @@
 from fastapi import Depends, HTTPException, status, Cookie
 from appwrite.services.account import Account
 from appwrite.services.users import Users
-from core.appwrite import get_account, get_user_register
+from core.appwrite import get_account, get_user_register, get_gateway, AppwriteGateway
+from core.cache import make_cache
 from core.config import settings
+from core.log import get_logger
+import hashlib
 import jwt
 import datetime
 
-def authenticate_user(
+log = get_logger(__name__)
+
+# Verified users keyed by sha256 of the token; an entry never outlives the token's exp.
+claims_cache = make_cache("memory", ttl=settings.AUTH_CACHE_TTL, maxsize=settings.AUTH_CACHE_MAXSIZE)
+
+async def authenticate_user(
     access_token: str = Cookie(None),
-    users: Users = Depends(get_user_register)
-): 
+    users: AppwriteGateway = Depends(get_gateway)
+):
     if not access_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated"
         )
     try:
-        jwt_info = jwt.decode(access_token, settings.SECRET_KEY, settings.ALGORITHM) 
-        print('this is decoded',jwt_info)
-        if int(datetime.datetime.now().timestamp()) > jwt_info['exp']:
+        jwt_info = jwt.decode(access_token, settings.SECRET_KEY, settings.ALGORITHM)
+        now = int(datetime.datetime.now().timestamp())
+        if now > jwt_info['exp']:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session token expired!")
-        
-        user = users.get(user_id=jwt_info.get("user_id"))
+
+        # Tokens issued before the name claim was added are still checked against Appwrite.
+        if settings.AUTH_TRUST_SIGNED_CLAIMS and "name" in jwt_info:
+            return {
+                "userId": jwt_info["user_id"],
+                "name": jwt_info["name"],
+                "email": jwt_info.get("email")
+            }
+
+        token_hash = hashlib.sha256(access_token.encode()).hexdigest()
+        cached = claims_cache.get(token_hash)
+        if cached is not None:
+            return cached
+
+        user = await users.get_user(user_id=jwt_info.get("user_id"))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
 
-        return {
+        current_user = {
             "userId": user["$id"],
             "name": user.get("name"),
             "email": user.get("email"),
             "secret": user.get("secret")
         }
-     
+        claims_cache.set(token_hash, current_user, ttl=min(settings.AUTH_CACHE_TTL, jwt_info['exp'] - now))
+
+        return current_user
+
+    except HTTPException:
+        raise
     except Exception as e:
-        print(e)
+        log.warning("Invalid session token", error=str(e) or type(e).__name__)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid session token"
         )
-
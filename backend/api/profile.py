@@ -1,14 +1,23 @@
 from appwrite.query import Query
-from pyparsing import Optional
-from core.appwrite import database
+from core.appwrite import get_gateway
+from models.userModel import profile_cache
 from core.config import settings 
+from core.log import get_logger
+import asyncio
 
-def check_profile_exists(user_id: str) -> tuple[bool, str|None]:
+log = get_logger(__name__)
+
+async def check_profile_exists(user_id: str) -> tuple[bool, str|None]:
      try:   
         user_id = user_id.strip()
+
+        cache_key = f"profile:{user_id}:exists"
+        cached = await asyncio.to_thread(profile_cache.get, cache_key)
+        if cached is not None:
+            return tuple(cached)
         
-        db = database()
-        existing = db.list_documents(
+        db = get_gateway()
+        existing = await db.list_documents(
             database_id=settings.APPWRITE_DATABASE_ID,
             collection_id=settings.APPWRITE_USER_COLLECTION_ID,
             queries=[Query.equal("user_id", user_id)]
@@ -16,9 +25,13 @@ def check_profile_exists(user_id: str) -> tuple[bool, str|None]:
 
         if existing["total"] > 0:
             doc_id = existing["documents"][0]["$id"]
+            await asyncio.to_thread(profile_cache.set, cache_key, [True, doc_id])
             return True, doc_id
 
+        # Misses are not cached: another worker may create the profile, and its
+        # invalidation does not reach this worker's cache, so a cached miss would
+        # let create_profile insert a duplicate.
         return False, None
      except Exception as e:
-        print("Error checking profile existence:", str(e))
+        log.exception("Error checking profile existence", user_id=user_id)
         return False, None  
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Per-call latency of ``authenticate_user`` in its three modes:
+
+- lookup:  claims cache bypassed, one Appwrite ``users.get`` per call (the old behaviour)
+- cached:  verified-claims cache hit after the first call
+- trusted: ``AUTH_TRUST_SIGNED_CLAIMS`` on, no Appwrite call at all
+
+    python -m benchmarks.auth_latency --iterations 500 --latency-ms 20
+"""
+from benchmarks.common import configure_env, make_token, serve
+
+configure_env()
+
+from api import auth
+from core.appwrite import AppwriteGateway
+from core.config import settings
+import argparse
+import asyncio
+import time
+
+
+async def measure(gateway: AppwriteGateway, token: str, iterations: int, mode: str) -> list[float]:
+    settings.AUTH_TRUST_SIGNED_CLAIMS = mode == "trusted"
+    auth.claims_cache.clear()
+    await auth.authenticate_user(access_token=token, users=gateway)
+
+    timings = []
+    for _ in range(iterations):
+        if mode == "lookup":
+            auth.claims_cache.clear()
+        started = time.perf_counter()
+        await auth.authenticate_user(access_token=token, users=gateway)
+        timings.append(time.perf_counter() - started)
+
+    return sorted(timings)
+
+
+async def run(iterations: int) -> dict:
+    gateway = AppwriteGateway.from_settings()
+    token = make_token()
+    try:
+        return {mode: await measure(gateway, token, iterations, mode) for mode in ("lookup", "cached", "trusted")}
+    finally:
+        await gateway.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with serve("benchmarks.stub_appwrite:app", 8790, {"STUB_APPWRITE_LATENCY_MS": str(args.latency_ms)}):
+        results = asyncio.run(run(args.iterations))
+
+    print(f"authenticate_user  iterations={args.iterations}  appwrite latency={args.latency_ms}ms")
+    print(f"{'mode':<10}{'mean us':>12}{'p50 us':>12}{'p99 us':>12}")
+    for mode, timings in results.items():
+        mean = sum(timings) / len(timings)
+        print(f"{mode:<10}{mean * 1e6:>12.1f}{timings[len(timings) // 2] * 1e6:>12.1f}{timings[int(len(timings) * 0.99)] * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Shared helpers for the benchmarks: environment defaults, auth tokens, server
+processes and a small closed-loop load generator.
+
+Run benchmarks from the ``backend`` directory, e.g. ``python -m benchmarks.profile_get``.
+"""
+from contextlib import contextmanager
+import asyncio
+import datetime
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCH_ENV = {
+    "DATABASE_URL": "sqlite:///./bench.db",
+    "DEBUG": "True",
+    "ALLOWED_ORIGINS": "http://localhost:5173",
+    "IS_PRODUCTION": "False",
+    "OPENAI_API_KEY": "sk-bench",
+    "LLM_MODEL": "gpt-4o-mini",
+    "APPWRITE_PROJECT_ID": "bench",
+    "APPWRITE_ENDPOINT": "http://127.0.0.1:8790/v1",
+    "APPWRITE_API_KEY": "bench-key",
+    "APPWRITE_DATABASE_ID": "db",
+    "APPWRITE_RESUME_COLLECTION_ID": "resume",
+    "APPWRITE_EDUCATION_COLLECTION_ID": "education",
+    "APPWRITE_PROJECT_COLLECTION_ID": "projects",
+    "APPWRITE_SKILLS_COLLECTION_ID": "skills",
+    "APPWRITE_EXPERIENCE_COLLECTION_ID": "experience",
+    "APPWRITE_USER_COLLECTION_ID": "users",
+    "APPWRITE_CV_COLLECTION_ID": "cv",
+    "SECRET_KEY": "bench-secret-key-for-local-benchmarks",
+    "ALGORITHM": "HS256",
+}
+
+
+def configure_env():
+    """Fill in any settings the benchmark needs; must run before importing ``core.config``."""
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def make_token(user_id: str = "bench-user", name: str | None = "Bench User") -> str:
+    """A session token like ``/login`` issues; ``name=None`` leaves the claim out, as older tokens did."""
+    import jwt
+
+    payload = {
+        "user_id": user_id,
+        "email": "bench@example.com",
+        "secret": "bench-secret",
+        "exp": datetime.datetime.now(datetime.UTC) + datetime.timedelta(hours=2),
+    }
+    if name is not None:
+        payload["name"] = name
+    return jwt.encode(payload, os.environ["SECRET_KEY"], os.environ["ALGORITHM"])
+
+
+@contextmanager
+def serve(app_path: str, port: int, extra_env: dict | None = None):
+    """Run ``app_path`` under uvicorn in a child process until the block exits."""
+    import httpx
+
+    env = {**os.environ, **(extra_env or {})}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--port", str(port), "--log-level", "warning", "--no-access-log", "--timeout-keep-alive", "30"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/", timeout=0.5)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError(f"{app_path} did not start on port {port}")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+async def _load(url: str, cookies: dict, concurrency: int, duration: float) -> dict:
+    import httpx
+
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        # One client per worker keeps each httpx pool at a single connection, so the
+        # load generator itself stays cheap on small machines.
+        async with httpx.AsyncClient(cookies=cookies, timeout=60) as client:
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.TransportError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+    }
+
+
+def load(url: str, cookies: dict, concurrency: int = 64, duration: float = 10.0) -> dict:
+    return asyncio.run(_load(url, cookies, concurrency, duration))
@@ -0,0 +1,72 @@
+"""
+Cold-start cost of the API: ``import main`` in a fresh interpreter, profiled with
+``python -X importtime``.
+
+Prints the median wall time of the import over ``--runs`` interpreters, then the
+modules with the largest cumulative import time in the last run. The libraries in
+``LAZY_MODULES`` load on first use or during warm-up and must not appear at all;
+the exit status is 1 if one does.
+
+    python -m benchmarks.import_time --runs 5 --top 25
+"""
+from benchmarks.common import BACKEND_DIR, configure_env
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+configure_env()
+
+# Loaded by warm-up or on first use, never by ``import main``.
+LAZY_MODULES = ("langchain_openai", "langchain_core", "openai", "tiktoken", "reportlab", "docx")
+
+
+def profile_import(module: str = "main") -> tuple[float, list[tuple[int, str]]]:
+    """Seconds spent importing ``module`` and ``(cumulative us, name)`` for every module it loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr[-2000:])
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.append((int(cumulative), name.rstrip()))
+
+    total = next(cumulative for cumulative, name in reversed(modules) if name.strip() == module)
+    return total / 1e6, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--module", default="main")
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        seconds, modules = profile_import(args.module)
+        timings.append(seconds)
+
+    print(f"import {args.module}: median {statistics.median(timings) * 1e3:.0f} ms, min {min(timings) * 1e3:.0f} ms over {args.runs} runs")
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative, name in sorted(modules, reverse=True)[:args.top]:
+        print(f"{cumulative / 1e3:>14.1f}  {name}")
+
+    loaded = sorted({name.strip() for _, name in modules if name.strip().split(".")[0] in LAZY_MODULES})
+    if loaded:
+        print(f"loaded at import but should be lazy: {', '.join(loaded)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cost of building the LLM client and chain on every request vs reusing the ones
+``ResumeGenerator.configure`` builds at startup.
+
+- construct: ``_build_llm`` + ``_build_chain`` alone (the old per-request overhead)
+- per-request: construct, then ``ainvoke`` against ``benchmarks.stub_openai``
+- reused: ``ainvoke`` on the prebuilt chain
+
+    python -m benchmarks.llm_chain --iterations 200 --latency-ms 20
+"""
+from benchmarks.common import configure_env, serve
+
+configure_env()
+
+from core.resume_generator import ResumeGenerator
+import argparse
+import asyncio
+import httpx
+import os
+import time
+
+PORT = 8791
+
+
+def summary(timings: list[float]) -> str:
+    timings = sorted(timings)
+    mean = sum(timings) / len(timings)
+    return f"{mean * 1e3:>10.3f}{timings[len(timings) // 2] * 1e3:>10.3f}{timings[int(len(timings) * 0.99)] * 1e3:>10.3f}"
+
+
+def construct(template: str):
+    return ResumeGenerator._build_chain(ResumeGenerator._build_llm(), template)
+
+
+async def run(iterations: int) -> dict:
+    user_input = {"user_input": str({"title": "Backend Engineer", "template": "modern-2"})}
+    results = {}
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        construct("modern-2")
+        timings.append(time.perf_counter() - started)
+    results["construct"] = timings
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await construct("modern-2").ainvoke(user_input)
+        timings.append(time.perf_counter() - started)
+    results["per-request"] = timings
+
+    ResumeGenerator.configure()
+    chain = ResumeGenerator._get_chain("modern-2")
+    await chain.ainvoke(user_input)
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await ResumeGenerator._get_chain("modern-2").ainvoke(user_input)
+        timings.append(time.perf_counter() - started)
+    results["reused"] = timings
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{PORT}/v1"
+    with serve("benchmarks.stub_openai:app", PORT, {"STUB_OPENAI_LATENCY_MS": str(args.latency_ms)}) as url:
+        results = asyncio.run(run(args.iterations))
+        connections = httpx.get(f"{url}/stats").json()["connections"]
+
+    print(f"LLM chain  iterations={args.iterations}  provider latency={args.latency_ms}ms")
+    print(f"{'mode':<14}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode, timings in results.items():
+        print(f"{mode:<14}{summary(timings)}")
+    print(f"connections opened on the stub: {connections}")
+
+
+if __name__ == "__main__":
+    main()
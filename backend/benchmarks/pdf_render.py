@@ -0,0 +1,72 @@
+"""
+PDF rendering time for a typical two-page resume, per template, against the 20ms
+target: layout (wrapping, pagination) and the reportlab canvas work.
+
+The resume is the synthetic one from ``benchmarks.parse_sections`` split into fields
+by ``_extract_resume_sections``; entries are added until it fills two pages. As
+with ``timeit``, the garbage collector is off while timing. Exits 1 when a
+template's p50 is over the target.
+
+    python -m benchmarks.pdf_render --iterations 200
+"""
+from benchmarks.common import configure_env
+
+configure_env()
+
+from benchmarks.parse_sections import TEMPLATES, make_resume
+from core.pdf_layout import layout_resume, render_resume_pdf
+from core.resume_generator import ResumeGenerator
+import argparse
+import gc
+import sys
+import time
+
+TARGET_MS = 20.0
+
+
+def two_page_resume(template: str) -> tuple[dict, int]:
+    """The longest synthetic resume that still lays out on two pages."""
+    entries = 1
+    while len(layout_resume(ResumeGenerator._extract_resume_sections(make_resume(entries + 1), template), template)) <= 2:
+        entries += 1
+    return ResumeGenerator._extract_resume_sections(make_resume(entries), template), entries
+
+
+def measure(func, iterations: int) -> list[float]:
+    func()
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return sorted(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--target", type=float, default=TARGET_MS, help="p50 render target in ms")
+    args = parser.parse_args()
+
+    print(f"two-page resume PDF  iterations={args.iterations}  target p50 < {args.target:g}ms")
+    print(f"{'template':<10}{'entries':>8}{'layout ms':>11}{'render p50':>12}{'render p99':>12}{'KiB':>7}  result")
+    failed = False
+    for template in TEMPLATES:
+        resume, entries = two_page_resume(template)
+        layout = measure(lambda: layout_resume(resume, template), args.iterations)
+        render = measure(lambda: render_resume_pdf(resume, template), args.iterations)
+        size = len(render_resume_pdf(resume, template).getvalue()) / 1024
+        p50 = render[len(render) // 2] * 1e3
+        ok = p50 < args.target
+        failed |= not ok
+        print(f"{template:<10}{entries:>8}{layout[len(layout) // 2] * 1e3:>11.2f}{p50:>12.2f}{render[int(len(render) * 0.99)] * 1e3:>12.2f}{size:>7.1f}  {'ok' if ok else 'OVER TARGET'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
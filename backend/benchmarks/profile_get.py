@@ -0,0 +1,96 @@
+"""
+Requests/sec on ``GET /api/v1/profile/get``: per-call SDK clients vs the shared gateway.
+
+``legacy_app`` reproduces the original route: a sync handler on the anyio threadpool
+that builds a new Appwrite ``Client`` for the auth lookup, the existence check and
+the profile fetch. ``main:app`` is the current async route on ``AppwriteGateway``.
+Both talk to ``benchmarks.stub_appwrite`` over real HTTP.
+
+    python -m benchmarks.profile_get --concurrency 64 --duration 10 --latency-ms 20
+"""
+from benchmarks.common import configure_env, make_token, serve, load
+
+configure_env()
+
+from fastapi import Cookie, Depends, FastAPI, HTTPException
+from appwrite.query import Query
+from core.appwrite import database, get_user_register
+from core.config import settings
+import argparse
+import jwt
+
+legacy_app = FastAPI()
+
+
+def legacy_authenticate_user(access_token: str = Cookie(None)):
+    if not access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    jwt_info = jwt.decode(access_token, settings.SECRET_KEY, settings.ALGORITHM)
+    user = get_user_register().get(user_id=jwt_info.get("user_id"))
+    return {"userId": user["$id"], "name": user.get("name"), "email": user.get("email")}
+
+
+def legacy_check_profile_exists(user_id: str):
+    existing = database().list_documents(
+        database_id=settings.APPWRITE_DATABASE_ID,
+        collection_id=settings.APPWRITE_USER_COLLECTION_ID,
+        queries=[Query.equal("user_id", user_id)],
+    )
+    return existing["total"] > 0
+
+
+def legacy_get_user_profile(user_id: str):
+    db = database()
+    sections = {}
+    for name, collection_id in [
+        ("profile", settings.APPWRITE_USER_COLLECTION_ID),
+        ("education", settings.APPWRITE_EDUCATION_COLLECTION_ID),
+        ("experience", settings.APPWRITE_EXPERIENCE_COLLECTION_ID),
+        ("skills", settings.APPWRITE_SKILLS_COLLECTION_ID),
+        ("resume", settings.APPWRITE_RESUME_COLLECTION_ID),
+        ("projects", settings.APPWRITE_PROJECT_COLLECTION_ID),
+    ]:
+        sections[name] = db.list_documents(
+            database_id=settings.APPWRITE_DATABASE_ID,
+            collection_id=collection_id,
+            queries=[Query.equal("user_id", user_id)],
+        )["documents"]
+    sections["profile"] = sections["profile"][0] if sections["profile"] else None
+    return sections
+
+
+@legacy_app.get("/api/v1/profile/get")
+def legacy_profile_get(current_user=Depends(legacy_authenticate_user)):
+    if not legacy_check_profile_exists(current_user["userId"]):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return legacy_get_user_profile(current_user["userId"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    cookies = {"access_token": make_token()}
+    stub_env = {"STUB_APPWRITE_LATENCY_MS": str(args.latency_ms)}
+    results = {}
+
+    with serve("benchmarks.stub_appwrite:app", 8790, stub_env):
+        for label, app_path, port in [
+            ("before (per-call Client, sync)", "benchmarks.profile_get:legacy_app", 8791),
+            ("after (shared gateway, async)", "main:app", 8792),
+        ]:
+            with serve(app_path, port) as base_url:
+                load(f"{base_url}/api/v1/profile/get", cookies, concurrency=4, duration=1.0)
+                results[label] = load(f"{base_url}/api/v1/profile/get", cookies, args.concurrency, args.duration)
+
+    print(f"GET /profile/get  concurrency={args.concurrency}  appwrite latency={args.latency_ms}ms")
+    print(f"{'variant':<34}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for label, r in results.items():
+        print(f"{label:<34}{r['rps']:>10.1f}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput of ``agenerate_resume`` against a provider with a concurrency quota.
+
+The fake provider answers after ``--latency-ms`` and returns 429 with
+``Retry-After`` whenever more than ``--quota`` calls are in flight. ``fixed`` keeps
+the scheduler at ``LLM_MAX_IN_FLIGHT`` and only retries; ``aimd`` lets
+``llm_limiter`` adapt the limit.
+
+    python -m benchmarks.rate_limit --requests 400 --quota 8 --max-in-flight 32
+"""
+from benchmarks.common import configure_env
+
+configure_env()
+
+from core import resume_generator
+from core.config import settings
+from core.resume_generator import ResumeGenerator, generation_scheduler, llm_retry
+from core.scheduler import AIMDLimiter
+import argparse
+import asyncio
+import httpx
+import openai
+import time
+
+RESUME = "Jane Doe Resume\nJane Doe\nProfessional Summary\nBackend engineer.\n"
+
+
+class QuotaProvider:
+    def __init__(self, quota: int, latency: float, retry_after: float):
+        self.quota = quota
+        self.latency = latency
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.calls = 0
+        self.rejected = 0
+
+    async def ainvoke(self, payload: dict) -> str:
+        self.calls += 1
+        if self.in_flight >= self.quota:
+            self.rejected += 1
+            await asyncio.sleep(0.001)
+            response = httpx.Response(429, headers={"retry-after-ms": str(int(self.retry_after * 1000))}, request=httpx.Request("POST", "http://provider/v1/chat/completions"))
+            raise openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return RESUME
+
+
+async def run(mode: str, args) -> dict:
+    provider = QuotaProvider(args.quota, args.latency_ms / 1000, args.retry_after_ms / 1000)
+    ResumeGenerator._get_chain = classmethod(lambda cls, template="modern-2": provider)
+
+    generation_scheduler.set_limit(args.max_in_flight)
+    limiter = AIMDLimiter(generation_scheduler, 1, args.max_in_flight, decrease=args.decrease)
+    if mode == "fixed":
+        limiter.on_rate_limited = lambda epoch: None
+        limiter.on_success = lambda: None
+    resume_generator.llm_limiter = limiter
+    llm_retry.max_attempts = 100
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        ResumeGenerator.agenerate_resume({"title": f"resume {i}"}, user_id=f"user-{i % 16}", use_cache=False)
+        for i in range(args.requests)
+    ))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "rps": args.requests / elapsed,
+        "errors": sum(1 for result in results if result.get("error")),
+        "calls": provider.calls,
+        "rejected": provider.rejected,
+        "final_limit": limiter.limit,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--quota", type=int, default=8)
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--retry-after-ms", type=float, default=50.0)
+    parser.add_argument("--decrease", type=float, default=settings.LLM_AIMD_DECREASE, help="AIMD multiplicative decrease")
+    args = parser.parse_args()
+
+    ideal = args.quota / (args.latency_ms / 1000)
+    print(f"requests={args.requests}  quota={args.quota}  max in flight={args.max_in_flight}  ideal rps={ideal:.0f}")
+    print(f"{'mode':<8}{'rps':>8}{'% ideal':>9}{'calls':>8}{'429s':>8}{'errors':>8}{'limit':>7}")
+    for mode in ("fixed", "aimd"):
+        result = asyncio.run(run(mode, args))
+        print(f"{mode:<8}{result['rps']:>8.1f}{result['rps'] / ideal:>9.0%}{result['calls']:>8}{result['rejected']:>8}{result['errors']:>8}{result['final_limit']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Minimal in-memory stand-in for the Appwrite REST API used by the benchmarks.
+
+Only the routes the backend touches are implemented. Every response is delayed by
+``STUB_APPWRITE_LATENCY_MS`` to model the network round trip to Appwrite. The CV
+collection lists ``STUB_APPWRITE_RESUMES`` generated resumes, stored with the
+templates modern-2, modern-3, modern-1 in turn, and honours the
+``equal("$id")``, ``limit``, ``cursorAfter`` and ``select`` queries on them, with
+Appwrite's default page size of 25; single CV documents are served by id.
+
+The schema routes (databases, collections, attributes, indexes) keep what is
+created in memory, starting empty. New attributes and indexes report
+``processing`` for ``STUB_APPWRITE_BUILD_MS`` before turning ``available``, as
+Appwrite builds them in the background.
+"""
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+import asyncio
+import json
+import os
+import time
+
+LATENCY = float(os.getenv("STUB_APPWRITE_LATENCY_MS", "20")) / 1000
+RESUME_COUNT = int(os.getenv("STUB_APPWRITE_RESUMES", "1"))
+BUILD_TIME = float(os.getenv("STUB_APPWRITE_BUILD_MS", "500")) / 1000
+CV_COLLECTION_ID = os.getenv("APPWRITE_CV_COLLECTION_ID", "cv")
+TEMPLATES = ("modern-2", "modern-3", "modern-1")
+
+USER = {
+    "$id": "bench-user",
+    "name": "Bench User",
+    "email": "bench@example.com",
+}
+
+PROFILE = {
+    "$id": "profile-1",
+    "user_id": "bench-user",
+    "name": "Bench User",
+    "email": "bench@example.com",
+    "bio": "Backend engineer",
+    "phone": "+123456789",
+    "linkedin": "https://linkedin.com/in/bench",
+    "github": "https://github.com/bench",
+    "role": "user",
+}
+
+RESUMES = [
+    {
+        "$id": f"resume-{i}",
+        "$createdAt": "2025-01-01T00:00:00.000+00:00",
+        "$updatedAt": "2025-01-01T00:00:00.000+00:00",
+        "user_id": "bench-user",
+        "title": f"Backend Engineer Resume {i}",
+        "template": TEMPLATES[i % len(TEMPLATES)],
+        "name": "Bench User",
+        "email": "bench@example.com",
+        "phone": "+123456789",
+        "linkedin": "https://linkedin.com/in/bench",
+        "github": "https://github.com/bench",
+        "professionalsummary": "Backend engineer building reliable data platforms and APIs. " * 4,
+        "skills": "\n".join(f"- Skill {j}: Python, FastAPI, PostgreSQL, Kubernetes" for j in range(8)),
+        "workexperience": "\n".join(f"Senior Engineer, Company {j} (2015 - 2020)\n- Led migration {j} of the billing platform, cutting p99 latency by 40%." for j in range(6)),
+        "projects": "\n".join(f"- Project {j}: open-source scheduler with fair queueing." for j in range(4)),
+        "education": "BSc Computer Science, University (2011 - 2015)",
+        "certifications": None,
+    }
+    for i in range(RESUME_COUNT)
+]
+
+
+def query_resumes(queries: list) -> dict:
+    documents = RESUMES
+    limit = 25
+    fields = None
+    for query in queries:
+        if query["method"] == "equal" and query.get("attribute") == "$id":
+            documents = [document for document in documents if document["$id"] in query["values"]]
+    # Like Appwrite, the total counts every match, not just those after the cursor.
+    total = len(documents)
+
+    for query in queries:
+        method, values = query["method"], query.get("values", [])
+        if method == "cursorAfter":
+            ids = [document["$id"] for document in documents]
+            documents = documents[ids.index(values[0]) + 1:] if values[0] in ids else []
+        elif method == "limit":
+            limit = values[0]
+        elif method == "select":
+            fields = values
+
+    documents = documents[:limit]
+    if fields:
+        documents = [{key: value for key, value in document.items() if key in fields} for document in documents]
+    return {"total": total, "documents": documents}
+
+
+async def list_documents(request: Request):
+    await asyncio.sleep(LATENCY)
+    if request.path_params["collection_id"] == CV_COLLECTION_ID:
+        queries = [json.loads(value) for key, value in request.query_params.multi_items() if key.startswith("queries[")]
+        return JSONResponse(query_resumes(queries))
+    return JSONResponse({"total": 1, "documents": [PROFILE]})
+
+
+RESUMES_BY_ID = {document["$id"]: document for document in RESUMES}
+
+
+async def document(request: Request):
+    await asyncio.sleep(LATENCY)
+    if request.method == "DELETE":
+        return Response(status_code=204)
+    if request.path_params["collection_id"] == CV_COLLECTION_ID:
+        resume = RESUMES_BY_ID.get(request.path_params["document_id"])
+        if resume is None:
+            return JSONResponse({"message": "Document not found", "code": 404, "type": "document_not_found"}, status_code=404)
+        return JSONResponse(resume)
+    return JSONResponse({**PROFILE, "$id": request.path_params["document_id"]})
+
+
+async def create_document(request: Request):
+    await asyncio.sleep(LATENCY)
+    body = await request.json()
+    if "documents" in body:
+        documents = [{**document, "$id": f"doc-{i}"} for i, document in enumerate(body["documents"])]
+        return JSONResponse({"total": len(documents), "documents": documents}, status_code=201)
+    return JSONResponse({**body.get("data", {}), "$id": "doc-1"}, status_code=201)
+
+
+async def get_user(request: Request):
+    await asyncio.sleep(LATENCY)
+    return JSONResponse({**USER, "$id": request.path_params["user_id"]})
+
+
+def conflict(message: str) -> JSONResponse:
+    return JSONResponse({"message": message, "code": 409, "type": "conflict"}, status_code=409)
+
+
+def not_found(message: str) -> JSONResponse:
+    return JSONResponse({"message": message, "code": 404, "type": "not_found"}, status_code=404)
+
+
+# database id -> collection id -> {"name", "attributes": {key: ...}, "indexes": {key: ...}}
+DATABASES: dict = {}
+
+
+def with_status(item: dict) -> dict:
+    ready = time.monotonic() >= item["_ready_at"]
+    return {key: value for key, value in item.items() if key != "_ready_at"} | {"status": "available" if ready else "processing"}
+
+
+async def database(request: Request):
+    await asyncio.sleep(LATENCY)
+    if request.method == "POST":
+        body = await request.json()
+        if body["databaseId"] in DATABASES:
+            return conflict("Database already exists")
+        DATABASES[body["databaseId"]] = {}
+        return JSONResponse({"$id": body["databaseId"], "name": body["name"]}, status_code=201)
+    if request.path_params["database_id"] not in DATABASES:
+        return not_found("Database not found")
+    return JSONResponse({"$id": request.path_params["database_id"]})
+
+
+async def collection(request: Request):
+    await asyncio.sleep(LATENCY)
+    collections = DATABASES.get(request.path_params["database_id"])
+    if collections is None:
+        return not_found("Database not found")
+    if request.method == "POST":
+        body = await request.json()
+        if body["collectionId"] in collections:
+            return conflict("Collection already exists")
+        collections[body["collectionId"]] = {"name": body["name"], "attributes": {}, "indexes": {}}
+        return JSONResponse({"$id": body["collectionId"], "name": body["name"]}, status_code=201)
+    if request.path_params["collection_id"] not in collections:
+        return not_found("Collection not found")
+    return JSONResponse({"$id": request.path_params["collection_id"]})
+
+
+async def schema_items(request: Request):
+    await asyncio.sleep(LATENCY)
+    kind = request.path_params.get("kind", "attributes")
+    found = DATABASES.get(request.path_params["database_id"], {}).get(request.path_params["collection_id"])
+    if found is None:
+        return not_found("Collection not found")
+    items = found[kind]
+
+    if request.method == "GET":
+        listed = [with_status(item) for item in items.values()]
+        return JSONResponse({"total": len(listed), kind: listed})
+
+    body = await request.json()
+    if body["key"] in items:
+        return conflict(f"{kind[:-1].capitalize()} already exists")
+    item = dict(body)
+    if kind == "attributes":
+        attribute_type = request.path_params.get("type", "string")
+        if attribute_type in ("email", "url"):
+            item["type"], item["format"] = "string", attribute_type
+        else:
+            item["type"] = attribute_type
+    items[body["key"]] = {**item, "_ready_at": time.monotonic() + BUILD_TIME}
+    return JSONResponse(with_status(items[body["key"]]), status_code=202)
+
+
+documents_path = "/v1/databases/{database_id}/collections/{collection_id}/documents"
+collection_path = "/v1/databases/{database_id}/collections/{collection_id}"
+
+app = Starlette(routes=[
+    Route(documents_path, list_documents, methods=["GET"]),
+    Route(documents_path, create_document, methods=["POST"]),
+    Route(documents_path + "/{document_id}", document, methods=["GET", "PATCH", "DELETE"]),
+    Route("/v1/users/{user_id}", get_user, methods=["GET"]),
+    Route("/v1/databases", database, methods=["POST"]),
+    Route("/v1/databases/{database_id}", database, methods=["GET"]),
+    Route("/v1/databases/{database_id}/collections", collection, methods=["POST"]),
+    Route(collection_path, collection, methods=["GET"]),
+    Route(collection_path + "/{kind:str}", schema_items, methods=["GET", "POST"]),
+    Route(collection_path + "/attributes/{type}", schema_items, methods=["POST"]),
+])
@@ -0,0 +1,43 @@
+"""
+Minimal stand-in for the OpenAI chat completions API used by the benchmarks.
+
+Returns a fixed resume after ``STUB_OPENAI_LATENCY_MS`` and counts the TCP
+connections it has accepted, exposed at ``GET /stats``.
+"""
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+import asyncio
+import os
+import time
+
+LATENCY = float(os.getenv("STUB_OPENAI_LATENCY_MS", "20")) / 1000
+
+RESUME = "Jane Doe Resume\nJane Doe\nEmail: jane@example.com | Phone: +1 555 0100\nProfessional Summary\nBackend engineer.\nSkills\nPython, FastAPI\n"
+
+connections = set()
+
+
+async def chat_completions(request: Request):
+    await asyncio.sleep(LATENCY)
+    body = await request.json()
+    connections.add(request.client)
+    return JSONResponse({
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": RESUME}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 40, "total_tokens": 140, "prompt_tokens_details": {"cached_tokens": 64}},
+    })
+
+
+async def stats(request: Request):
+    return JSONResponse({"connections": len(connections)})
+
+
+app = Starlette(routes=[
+    Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+    Route("/stats", stats, methods=["GET"]),
+])
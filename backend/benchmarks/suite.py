@@ -0,0 +1,288 @@
+"""
+Benchmark suite for the hot paths, runnable offline:
+
+- parse/<template>/<size>:  ``ResumeGenerator._extract_resume_sections`` (which now
+  includes the template post-processing) on synthetic resumes from 1KB to 1MB
+- render/<pdf|docx>/<size>: ``render_pdf`` / ``render_word`` from the parsed fields,
+  behind the download routes
+- e2e/resume-create:        ``POST /api/v1/resume/create`` with a fake LLM and
+  ``benchmarks.stub_appwrite`` on localhost
+- e2e/pdf-download-*:       repeat ``GET /api/v1/resume/pdf/{id}``, served from the
+  rendered-artifact cache or answered 304 via ``If-None-Match``
+- startup/import-main:      ``import main`` in a fresh interpreter (see
+  ``benchmarks.import_time`` for the per-module profile)
+
+Results are written as JSON. With ``--baseline`` every case is compared to the stored
+run and the exit status is 1 if any p50 is more than ``--threshold`` slower.
+
+    python -m benchmarks.suite --output results.json --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --filter parse/modern-2
+"""
+from benchmarks.common import BACKEND_DIR, configure_env, make_token, serve
+import os
+import tempfile
+
+configure_env()
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "bench_llm_cache.sqlite3"))
+os.environ.setdefault("ARTIFACT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "bench_artifact_cache"))
+
+from benchmarks.import_time import profile_import
+from benchmarks.parse_sections import TEMPLATES, make_resume
+from benchmarks.stub_appwrite import TEMPLATES as STUB_TEMPLATES, USER as STUB_USER
+from core.resume_generator import ResumeGenerator
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from core.pdf_layout import LAYOUTS
+from core.rendering import render_pdf, render_word
+from reportlab.lib.rl_accel import fp_str
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+import zlib
+
+PARSE_SIZES = {"1KB": 1 << 10, "16KB": 16 << 10, "256KB": 256 << 10, "1MB": 1 << 20}
+# python-docx slows down sharply past a few hundred KB (a 1MB resume takes ~10s), and
+# no real resume gets anywhere near that.
+RENDER_SIZES = {"1KB": 1 << 10, "16KB": 16 << 10, "256KB": 256 << 10}
+
+CREATE_BODY = {
+    "title": "Backend Engineer",
+    "template": "modern-2",
+    "education": "BSc Computer Science, 2015",
+    "experience": "Senior engineer at Acme, 2015 - 2020",
+    "projects": "Fair scheduler for LLM calls",
+    "skills": "Python, FastAPI, PostgreSQL",
+    "certifications": None,
+}
+
+
+def resume_of_size(size: int) -> str:
+    """Synthetic resume of roughly ``size`` bytes."""
+    per_entry = len(make_resume(11)) - len(make_resume(10))
+    base = len(make_resume(0))
+    return make_resume(max(1, (size - base) // per_entry))
+
+
+def measure(func, min_time: float, min_iterations: int = 5, max_iterations: int = 1000) -> dict:
+    func()  # warm-up
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_iterations or (time.perf_counter() - started < min_time and len(timings) < max_iterations):
+        call_started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - call_started)
+
+    timings.sort()
+    return {
+        "iterations": len(timings),
+        "min": timings[0],
+        "p50": timings[len(timings) // 2],
+        "p99": timings[int(len(timings) * 0.99)],
+        "mean": sum(timings) / len(timings),
+    }
+
+
+def parse_cases():
+    for size_name, size in PARSE_SIZES.items():
+        text = resume_of_size(size)
+        for template in TEMPLATES:
+            yield f"parse/{template}/{size_name}", lambda text=text, template=template: ResumeGenerator._extract_resume_sections(text, template)
+
+
+def render_cases():
+    for size_name, size in RENDER_SIZES.items():
+        text = resume_of_size(size)
+        resume = ResumeGenerator._extract_resume_sections(text)
+        yield f"render/pdf/{size_name}", lambda resume=resume: render_pdf(resume)
+        yield f"render/docx/{size_name}", lambda resume=resume: render_word(resume)
+
+
+def pdf_content(data: bytes) -> bytes:
+    """The PDF with its Flate-compressed streams inflated, to search for drawing operators."""
+    streams = re.findall(rb">>\s*stream\r?\n(.*?)endstream", data, re.S)
+    return data + b"".join(zlib.decompress(stream) for stream in streams)
+
+
+def check_stored_templates(loop, client):
+    """
+    The stub's resume-0, -1 and -2 are stored as modern-2, modern-3 and modern-1;
+    downloaded without ``?template=`` each must come out in its own layout: page
+    size, body font and heading case.
+    """
+    for i, template in enumerate(STUB_TEMPLATES):
+        response = loop.run_until_complete(client.get(f"/api/v1/resume/pdf/resume-{i}"))
+        response.raise_for_status()
+        layout = LAYOUTS[template]
+        heading = "PROFESSIONAL SUMMARY" if layout.heading_upper else "Professional Summary"
+        expected = [
+            f"/MediaBox [ 0 0 {fp_str(*layout.pagesize)} ]".encode(),
+            f"/BaseFont /{layout.body_font}".encode(),
+            f"({heading}) Tj".encode(),
+        ]
+        content = pdf_content(response.content)
+        missing = [marker.decode() for marker in expected if marker not in content]
+        if missing:
+            raise RuntimeError(f"resume-{i} was not rendered with its stored template {template}: no {', '.join(missing)}")
+
+
+def check_trusted_claims(loop):
+    """
+    With ``AUTH_TRUST_SIGNED_CLAIMS`` on, a token's own claims are used, never its
+    ``secret``; a token from before the ``name`` claim is looked up in Appwrite instead.
+    """
+    from api import auth
+    from core.appwrite import get_gateway
+    from core.config import settings
+
+    trusted = settings.AUTH_TRUST_SIGNED_CLAIMS
+    settings.AUTH_TRUST_SIGNED_CLAIMS = True
+    try:
+        user = loop.run_until_complete(auth.authenticate_user(access_token=make_token(name="Token Name"), users=get_gateway()))
+        if "secret" in user or user["name"] != "Token Name":
+            raise RuntimeError(f"trusted claims were not taken from the token as is: {user}")
+        user = loop.run_until_complete(auth.authenticate_user(access_token=make_token(name=None), users=get_gateway()))
+        if user["name"] != STUB_USER["name"]:
+            raise RuntimeError(f"a token without the name claim was not looked up in Appwrite: {user}")
+    finally:
+        settings.AUTH_TRUST_SIGNED_CLAIMS = trusted
+        auth.claims_cache.clear()
+
+
+def e2e_cases():
+    import httpx
+    import main
+
+    resume_text = make_resume(5)
+    ResumeGenerator._build_llm = classmethod(lambda cls: FakeListChatModel(responses=[resume_text]))
+    ResumeGenerator.configure()
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app),
+        base_url="http://bench",
+        cookies={"access_token": make_token()},
+    )
+
+    def create():
+        response = loop.run_until_complete(client.post("/api/v1/resume/create", params={"cache": "false"}, json=CREATE_BODY))
+        response.raise_for_status()
+
+    def download(headers=None):
+        response = loop.run_until_complete(client.get("/api/v1/resume/pdf/resume-0", headers=headers))
+        if response.status_code not in (200, 304):
+            response.raise_for_status()
+        return response
+
+    check_stored_templates(loop, client)
+    check_trusted_claims(loop)
+
+    etag = download().headers["etag"]
+
+    try:
+        yield "e2e/resume-create", create
+        yield "e2e/pdf-download-cached", download
+        yield "e2e/pdf-download-304", lambda: download({"If-None-Match": etag})
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+
+
+def startup_cases():
+    yield "startup/import-main", profile_import
+
+
+def run(case_filter: str | None, min_time: float) -> dict:
+    results = {}
+
+    def run_cases(cases):
+        for name, func in cases:
+            if case_filter and case_filter not in name:
+                continue
+            results[name] = measure(func, min_time)
+            print(f"{name:<28}{results[name]['p50'] * 1e3:>12.3f} ms  ({results[name]['iterations']} runs)", file=sys.stderr)
+
+    run_cases(parse_cases())
+    run_cases(render_cases())
+    run_cases(startup_cases())
+
+    if not case_filter or "e2e" in case_filter:
+        with serve("benchmarks.stub_appwrite:app", 8790, {"STUB_APPWRITE_LATENCY_MS": "0", "STUB_APPWRITE_RESUMES": str(len(STUB_TEMPLATES))}):
+            run_cases(e2e_cases())
+
+    return results
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "created_at": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print the p50 of every case against the baseline and return the regressed ones."""
+    regressions = []
+    print(f"{'case':<28}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<28}{'-':>14}{result['p50'] * 1e3:>14.3f}{'new':>10}")
+            continue
+
+        change = result["p50"] / before["p50"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28}{before['p50'] * 1e3:>14.3f}{result['p50'] * 1e3:>14.3f}{change:>+10.1%}{flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--save-baseline", help="write the results to this file as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--filter", help="only run cases whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend on each case")
+    args = parser.parse_args()
+
+    report = {"meta": metadata(), "results": run(args.filter, args.min_time)}
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+                f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report["results"], baseline["results"], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+    elif not args.output and not args.save_baseline:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+
+if __name__ == "__main__":
+    main()
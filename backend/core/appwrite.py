@@ -1,9 +1,15 @@
 from fastapi import FastAPI, HTTPException
 from appwrite.client import Client
+from appwrite.exception import AppwriteException
 from appwrite.services.users import Users
 from appwrite.services.account import Account
 from appwrite.services.databases import Databases
 from core.config import settings
+from core.metrics import appwrite_request_seconds
+from typing import Any, Dict, List, Optional
+import asyncio
+import httpx
+import time
 
 def Root():
     client = Client() 
@@ -42,7 +48,227 @@ def database():
     db = get_client()
     
     return Databases(db)
- 
-    
-    
-   
\ No newline at end of file
+
+
+# Collection id -> short name, from the APPWRITE_<NAME>_COLLECTION_ID settings.
+COLLECTION_NAMES = {
+    getattr(settings, field): field[len("APPWRITE_"):-len("_COLLECTION_ID")].lower()
+    for field in type(settings).model_fields
+    if field.startswith("APPWRITE_") and field.endswith("_COLLECTION_ID")
+}
+
+
+class AppwriteGateway:
+    """
+    Async Appwrite client shared by the whole process.
+
+    The SDK's ``Client`` opens a fresh connection for every call; the gateway keeps
+    one pooled ``httpx.AsyncClient`` alive instead, so requests reuse keep-alive
+    connections and never block a worker thread. Method names and arguments mirror
+    ``Databases`` and ``Users`` so callers only need to add ``await``.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        project_id: str,
+        api_key: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        timeout: float = 10.0,
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=endpoint.rstrip("/"),
+            headers={
+                "x-appwrite-project": project_id,
+                "x-appwrite-key": api_key,
+                "x-sdk-name": "Python",
+                "x-sdk-platform": "server",
+                "x-sdk-language": "python",
+                "X-Appwrite-Response-Format": "1.7.0",
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=timeout,
+        )
+        # httpcore scans its whole waiting list on every checkout, so excess callers
+        # queue here instead of inside the pool.
+        self._slots = asyncio.Semaphore(max_connections)
+
+    @classmethod
+    def from_settings(cls) -> "AppwriteGateway":
+        return cls(
+            endpoint=settings.APPWRITE_ENDPOINT,
+            project_id=settings.APPWRITE_PROJECT_ID,
+            api_key=settings.APPWRITE_API_KEY,
+            max_connections=settings.APPWRITE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.APPWRITE_MAX_KEEPALIVE_CONNECTIONS,
+            timeout=settings.APPWRITE_TIMEOUT,
+        )
+
+    @staticmethod
+    def _collection_label(path: str) -> str:
+        # Configured collections by their setting's name ("cv", "users"...); the ids
+        # themselves are opaque and anything else would be unbounded.
+        if "/collections/" not in path:
+            return ""
+        collection_id = path.split("/collections/", 1)[1].split("/", 1)[0]
+        return COLLECTION_NAMES.get(collection_id, "other")
+
+    @staticmethod
+    def _flatten(data: Dict, prefix: str = "") -> Dict:
+        # Same query-string layout as ``Client.flatten``: queries[0]=..., queries[1]=...
+        output = {}
+        items = enumerate(data) if isinstance(data, list) else data.items()
+
+        for key, value in items:
+            final_key = f"{prefix}[{key}]" if prefix else str(key)
+            if isinstance(value, (list, dict)):
+                output.update(AppwriteGateway._flatten(value, final_key))
+            else:
+                output[final_key] = value
+
+        return output
+
+    async def call(self, method: str, path: str, params: Optional[Dict] = None, operation: str = "call") -> Any:
+        """
+        One REST call; ``operation`` labels its latency in ``appwrite_request_duration_seconds``
+        together with the collection and the response status.
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+
+        started = time.perf_counter()
+        status = "error"
+        try:
+            async with self._slots:
+                if method == "get":
+                    response = await self._client.request(method, path, params=self._flatten(params))
+                else:
+                    response = await self._client.request(method, path, json=params)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            raise AppwriteException(str(e))
+        finally:
+            appwrite_request_seconds.observe(time.perf_counter() - started, operation, self._collection_label(path), status)
+
+        if response.is_error:
+            if response.headers.get("content-type", "").startswith("application/json"):
+                body = response.json()
+                raise AppwriteException(body.get("message"), response.status_code, body.get("type"), response.text)
+            raise AppwriteException(response.text, response.status_code, None, response.text)
+
+        if not response.content:
+            return {}
+
+        return response.json()
+
+    async def list_documents(self, database_id: str, collection_id: str, queries: List[str] = None) -> Dict[str, Any]:
+        return await self.call(
+            "get",
+            f"/databases/{database_id}/collections/{collection_id}/documents",
+            {"queries": queries},
+            operation="list_documents",
+        )
+
+    async def get_document(self, database_id: str, collection_id: str, document_id: str, queries: List[str] = None) -> Dict[str, Any]:
+        return await self.call(
+            "get",
+            f"/databases/{database_id}/collections/{collection_id}/documents/{document_id}",
+            {"queries": queries},
+            operation="get_document",
+        )
+
+    async def create_document(self, database_id: str, collection_id: str, document_id: str, data: dict, permissions: List[str] = None) -> Dict[str, Any]:
+        return await self.call(
+            "post",
+            f"/databases/{database_id}/collections/{collection_id}/documents",
+            {"documentId": document_id, "data": data, "permissions": permissions},
+            operation="create_document",
+        )
+
+    async def create_documents(self, database_id: str, collection_id: str, documents: List[dict]) -> Dict[str, Any]:
+        return await self.call(
+            "post",
+            f"/databases/{database_id}/collections/{collection_id}/documents",
+            {"documents": documents},
+            operation="create_documents",
+        )
+
+    async def update_document(self, database_id: str, collection_id: str, document_id: str, data: dict = None, permissions: List[str] = None) -> Dict[str, Any]:
+        return await self.call(
+            "patch",
+            f"/databases/{database_id}/collections/{collection_id}/documents/{document_id}",
+            {"data": data, "permissions": permissions},
+            operation="update_document",
+        )
+
+    async def delete_document(self, database_id: str, collection_id: str, document_id: str) -> Dict[str, Any]:
+        return await self.call(
+            "delete",
+            f"/databases/{database_id}/collections/{collection_id}/documents/{document_id}",
+            operation="delete_document",
+        )
+
+    async def get_database(self, database_id: str) -> Dict[str, Any]:
+        return await self.call("get", f"/databases/{database_id}", operation="get_database")
+
+    async def create_database(self, database_id: str, name: str, enabled: bool = None) -> Dict[str, Any]:
+        return await self.call("post", "/databases", {"databaseId": database_id, "name": name, "enabled": enabled}, operation="create_database")
+
+    async def get_collection(self, database_id: str, collection_id: str) -> Dict[str, Any]:
+        return await self.call("get", f"/databases/{database_id}/collections/{collection_id}", operation="get_collection")
+
+    async def create_collection(self, database_id: str, collection_id: str, name: str, permissions: List[str] = None, document_security: bool = None, enabled: bool = None) -> Dict[str, Any]:
+        return await self.call(
+            "post",
+            f"/databases/{database_id}/collections",
+            {"collectionId": collection_id, "name": name, "permissions": permissions, "documentSecurity": document_security, "enabled": enabled},
+            operation="create_collection",
+        )
+
+    async def list_attributes(self, database_id: str, collection_id: str, queries: List[str] = None) -> Dict[str, Any]:
+        return await self.call("get", f"/databases/{database_id}/collections/{collection_id}/attributes", {"queries": queries}, operation="list_attributes")
+
+    async def create_attribute(self, database_id: str, collection_id: str, type: str, params: dict) -> Dict[str, Any]:
+        """``create_<type>_attribute`` for any ``type``; ``params`` use the REST names (``key``, ``size``, ``required``, ``default``...)."""
+        return await self.call("post", f"/databases/{database_id}/collections/{collection_id}/attributes/{type}", params, operation="create_attribute")
+
+    async def list_indexes(self, database_id: str, collection_id: str, queries: List[str] = None) -> Dict[str, Any]:
+        return await self.call("get", f"/databases/{database_id}/collections/{collection_id}/indexes", {"queries": queries}, operation="list_indexes")
+
+    async def create_index(self, database_id: str, collection_id: str, key: str, type: str, attributes: List[str], orders: List[str] = None) -> Dict[str, Any]:
+        return await self.call(
+            "post",
+            f"/databases/{database_id}/collections/{collection_id}/indexes",
+            {"key": key, "type": type, "attributes": attributes, "orders": orders},
+            operation="create_index",
+        )
+
+    async def get_user(self, user_id: str) -> Dict[str, Any]:
+        return await self.call("get", f"/users/{user_id}", operation="get_user")
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+_gateway: AppwriteGateway | None = None
+
+def get_gateway() -> AppwriteGateway:
+    global _gateway
+
+    if _gateway is None:
+        _gateway = AppwriteGateway.from_settings()
+
+    return _gateway
+
+async def start_gateway() -> AppwriteGateway:
+    return get_gateway()
+
+async def stop_gateway():
+    global _gateway
+
+    if _gateway is not None:
+        await _gateway.aclose()
+        _gateway = None
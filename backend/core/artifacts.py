@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from core.log import get_logger
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+log = get_logger(__name__)
+
+
+def artifact_key(document: Dict, kind: str, template: str, renderer_version: str) -> str:
+    """
+    Identity of a rendered document: the same key always means the same bytes.
+
+    Appwrite bumps ``$updatedAt`` on every write; documents without it (older API
+    versions, test doubles) are identified by their content instead.
+    """
+    revision = document.get("$updatedAt")
+    if not revision:
+        revision = hashlib.sha256(json.dumps(document, sort_keys=True, default=str).encode()).hexdigest()
+
+    identity = json.dumps([document.get("$id"), revision, kind, template, renderer_version])
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+class ArtifactCache:
+    """
+    Rendered files on local disk, bounded by total size with least-recently-used
+    eviction.
+
+    Files are written to a temporary name and renamed into place, so a reader never
+    sees a partial file and workers sharing the directory can write the same key
+    concurrently. Each process keeps its own LRU order, seeded from file mtimes at
+    startup; a file another worker evicted is simply a miss.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._size += size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def read(self, key: str) -> Optional[bytes]:
+        """
+        Contents of the cached file for ``key``, or None. The file is read in the
+        lookup itself, so one evicted by another worker in between is a miss rather
+        than a missing file at response time.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Touch it so the LRU order survives a restart.
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = len(data)
+                self._size += len(data)
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> Optional[str]:
+        """Store ``data`` and return its path; None if it could not be written."""
+        if len(data) > self.max_bytes:
+            return None
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            log.warning("Error occurred while caching rendered file", key=key, error=str(e))
+            return None
+
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(data)
+            self._size += len(data)
+            self._evict()
+        return self._path(key)
+
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "files": len(self._entries),
+            "bytes": self._size,
+        }
@@ -0,0 +1,269 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional
+import json
+import sqlite3
+import threading
+import time
+
+
+class CacheBackend:
+    """
+    Storage behind a ``Cache``. Values must be JSON-serialisable so that shared
+    backends can hand them to other worker processes.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    LRU with expiry stored in a SQLite file, so every uvicorn worker on the host
+    shares the same entries and invalidations. ``max_bytes`` additionally bounds the
+    total size of the stored values.
+
+    Every row records its value's size, and triggers keep the entry count and byte
+    total in ``cache_size`` up to date in the same transaction as the change. A write
+    therefore checks its limits with one row read, and evicts only the least
+    recently used entries it needs to, instead of scanning the table.
+    """
+
+    # Least recently used entries read per eviction query.
+    EVICT_BATCH = 32
+
+    def __init__(self, path: str, maxsize: int = 1024, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        with self._transaction():
+            self._create_schema()
+
+    def _create_schema(self):
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+            "size INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+        if "size" not in columns:
+            # A cache file from before sizes were tracked; measure its rows once.
+            self._conn.execute("ALTER TABLE cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE cache SET size = LENGTH(CAST(value AS BLOB))")
+
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_size ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO cache_size (id, entries, bytes) "
+            "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache BEGIN "
+            "UPDATE cache_size SET entries = entries + 1, bytes = bytes + NEW.size; END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache BEGIN "
+            "UPDATE cache_size SET entries = entries - 1, bytes = bytes - OLD.size; END"
+        )
+        self._conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size ON cache BEGIN "
+            "UPDATE cache_size SET bytes = bytes + NEW.size - OLD.size; END"
+        )
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            if row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        data = json.dumps(value)
+        size = len(data.encode())
+        with self._lock, self._transaction():
+            # An upsert rather than INSERT OR REPLACE: REPLACE's implicit delete
+            # does not fire the delete trigger.
+            self._conn.execute(
+                "INSERT INTO cache (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "value = excluded.value, expires_at = excluded.expires_at, accessed_at = excluded.accessed_at, size = excluded.size",
+                (key, data, now + ttl, now, size),
+            )
+            self._evict()
+
+    def _over(self, entries: int, total: int) -> bool:
+        return entries > self.maxsize or (self.max_bytes is not None and total > self.max_bytes)
+
+    def _evict(self):
+        entries, total = self._conn.execute("SELECT entries, bytes FROM cache_size").fetchone()
+        while self._over(entries, total):
+            rows = self._conn.execute(
+                "SELECT key, size FROM cache ORDER BY accessed_at LIMIT ?", (self.EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if not self._over(entries, total):
+                    break
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                entries -= 1
+                total -= size
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str):
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class Cache:
+    """
+    Read-through cache front: TTL, a pluggable backend and hit/miss counters.
+
+    Counters are per process even when the backend is shared.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.backend.set(key, value, self.ttl if ttl is None else ttl)
+
+    def delete(self, key: str):
+        self.backend.delete(key)
+
+    def delete_prefix(self, prefix: str):
+        self.backend.delete_prefix(prefix)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "size": len(self.backend),
+        }
+
+
+def make_cache(backend: str, ttl: float, maxsize: int, path: str | None = None, max_bytes: int | None = None) -> Cache:
+    if backend == "memory":
+        return Cache(MemoryBackend(maxsize=maxsize), ttl=ttl)
+
+    if backend == "sqlite":
+        if not path:
+            raise ValueError("A file path is required for the sqlite cache backend")
+        return Cache(SQLiteBackend(path, maxsize=maxsize, max_bytes=max_bytes), ttl=ttl)
+
+    raise ValueError(f"Unknown cache backend: {backend}")
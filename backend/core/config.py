@@ -15,6 +15,26 @@ class Settings(BaseSettings):
 
     OPENAI_API_KEY: str
     LLM_MODEL: str
+    LLM_MAX_IN_FLIGHT: int = 16
+    LLM_MIN_IN_FLIGHT: int = 1
+    LLM_AIMD_DECREASE: float = 0.75
+    LLM_RETRY_ATTEMPTS: int = 4
+    LLM_RETRY_BASE_DELAY: float = 1.0
+    LLM_RETRY_MAX_DELAY: float = 30.0
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "llm_cache.sqlite3"
+    LLM_CACHE_TTL: float = 7 * 24 * 60 * 60
+    LLM_CACHE_MAXSIZE: int = 10000
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    JOB_BACKEND: str = "memory"
+    JOB_DB_PATH: str = "jobs.sqlite3"
+    JOB_WORKERS: int = 4
+    JOB_LEASE_SECONDS: float = 300
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_RETRY_BASE_DELAY: float = 5.0
+    JOB_RETRY_MAX_DELAY: float = 120.0
     
     APPWRITE_PROJECT_ID: str
     APPWRITE_ENDPOINT: str
@@ -27,9 +47,40 @@ class Settings(BaseSettings):
     APPWRITE_EXPERIENCE_COLLECTION_ID:str
     APPWRITE_USER_COLLECTION_ID:str
     APPWRITE_CV_COLLECTION_ID:str
+    APPWRITE_MAX_CONNECTIONS: int = 100
+    APPWRITE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    APPWRITE_TIMEOUT: float = 10.0
+    APPWRITE_SECTION_TIMEOUT: float = 5.0
+    APPWRITE_PROVISION_SCHEMA: bool = False
+
+    PROFILE_CACHE_BACKEND: str = "memory"
+    PROFILE_CACHE_TTL: float = 300
+    PROFILE_CACHE_MAXSIZE: int = 1024
+    PROFILE_CACHE_PATH: str = "profile_cache.sqlite3"
+
+    RESUME_CACHE_BACKEND: str = "memory"
+    RESUME_CACHE_TTL: float = 300
+    RESUME_CACHE_MAXSIZE: int = 256
+    RESUME_CACHE_PATH: str = "resume_cache.sqlite3"
+
+    ARTIFACT_CACHE_DIR: str = "artifact_cache"
+    ARTIFACT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    RENDER_WORKERS: int = os.cpu_count() or 1
+    RENDER_QUEUE_SIZE: int = 32
+    RENDER_TIMEOUT: float = 30.0
+    
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01
     
     SECRET_KEY: str 
     ALGORITHM: str
+    AUTH_TRUST_SIGNED_CLAIMS: bool = False
+    AUTH_CACHE_TTL: float = 300
+    AUTH_CACHE_MAXSIZE: int = 10000
+    # Comma-separated Appwrite user ids that see the service-wide stats on /resume/queue.
+    ADMIN_USER_IDS: str = ""
 
     def __init__(self, **values):
         super().__init__(**values)
@@ -46,6 +97,10 @@ class Settings(BaseSettings):
     @field_validator('ALLOWED_ORIGINS')
     def parse_allowed_origin(cls, val) -> List[str]:
         return val.split(",") if val else []
+
+    @field_validator('ADMIN_USER_IDS')
+    def parse_admin_user_ids(cls, val) -> List[str]:
+        return [user_id.strip() for user_id in val.split(",") if user_id.strip()]
     
     class Config:
         env_file = '.env'
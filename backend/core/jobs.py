@@ -0,0 +1,319 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import heapq
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobStore:
+    """
+    Persistence for background jobs. A job is a plain dict with ``id``, ``user_id``,
+    ``status``, ``payload``, ``result``, ``error``, ``attempts`` and timestamps.
+
+    ``claim`` hands out queued jobs whose ``available_at`` has passed, and running
+    jobs whose lease has expired, so work picked up by a worker that died is retried
+    by the next one.
+
+    Stores are synchronous; ``JobQueue`` calls them from a thread.
+    """
+
+    def create(self, user_id: str, payload: Dict) -> Dict:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def claim(self, lease_seconds: float) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        raise NotImplementedError
+
+    def release(self, job_id: str, error: str, delay: float = 0.0):
+        """Put a claimed job back in the queue after a failed attempt, claimable after ``delay`` seconds."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _new_job(user_id: str, payload: Dict) -> Dict:
+        now = time.time()
+        return {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "status": QUEUED,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "lease_until": None,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+class MemoryJobStore(JobStore):
+    """
+    In-process store. Jobs do not survive a restart; use ``SQLiteJobStore`` for that.
+
+    Claimable jobs wait in a FIFO of ids and released ones in a heap ordered by when
+    they become available, so ``claim`` never looks at finished jobs.
+    """
+
+    def __init__(self, max_finished: int = 10000):
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Dict] = {}
+        self._pending: deque[str] = deque()
+        self._delayed: list[tuple[float, str]] = []
+        self._running: set[str] = set()
+        self._finished: deque[str] = deque()
+        self._lock = threading.Lock()
+
+    def create(self, user_id: str, payload: Dict) -> Dict:
+        job = self._new_job(user_id, payload)
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._pending.append(job["id"])
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def claim(self, lease_seconds: float) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            while self._delayed and self._delayed[0][0] <= now:
+                self._pending.append(heapq.heappop(self._delayed)[1])
+
+            if self._pending:
+                job = self._jobs[self._pending.popleft()]
+            else:
+                # At most one per worker; only one whose worker died is claimable.
+                job = next((self._jobs[job_id] for job_id in self._running if self._jobs[job_id]["lease_until"] < now), None)
+                if job is None:
+                    return None
+
+            job.update(status=RUNNING, attempts=job["attempts"] + 1, lease_until=now + lease_seconds, updated_at=now)
+            self._running.add(job["id"])
+            return dict(job)
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            self._jobs[job_id].update(status=status, result=result, error=error, lease_until=None, updated_at=time.time())
+            self._running.discard(job_id)
+            self._finished.append(job_id)
+            while len(self._finished) > self.max_finished:
+                del self._jobs[self._finished.popleft()]
+
+    def release(self, job_id: str, error: str, delay: float = 0.0):
+        now = time.time()
+        with self._lock:
+            self._jobs[job_id].update(status=QUEUED, error=error, lease_until=None, available_at=now + delay, updated_at=now)
+            self._running.discard(job_id)
+            if delay > 0:
+                heapq.heappush(self._delayed, (now + delay, job_id))
+            else:
+                self._pending.append(job_id)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Jobs kept in a SQLite file: they survive restarts, and every worker on the host
+    pulls from the same queue.
+    """
+
+    COLUMNS = ("id", "user_id", "status", "payload", "result", "error", "attempts", "lease_until", "available_at", "created_at", "updated_at")
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, user_id TEXT NOT NULL, status TEXT NOT NULL, payload TEXT NOT NULL, "
+            "result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, lease_until REAL, "
+            "available_at REAL NOT NULL DEFAULT 0, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "available_at" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN available_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+        self._lock = threading.Lock()
+
+    def _row_to_job(self, row) -> Dict:
+        job = dict(zip(self.COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def create(self, user_id: str, payload: Dict) -> Dict:
+        job = self._new_job(user_id, payload)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                (job["id"], user_id, QUEUED, json.dumps(payload), None, None, 0, None, job["available_at"], job["created_at"], job["updated_at"]),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim(self, lease_seconds: float) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM jobs "
+                    "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?) ORDER BY created_at LIMIT 1",
+                    (QUEUED, now, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ?",
+                    (RUNNING, now + lease_seconds, now, row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        job = self._row_to_job(row)
+        job.update(status=RUNNING, attempts=job["attempts"] + 1, lease_until=now + lease_seconds, updated_at=now)
+        return job
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+            )
+
+    def release(self, job_id: str, error: str, delay: float = 0.0):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, available_at = ?, updated_at = ? WHERE id = ?",
+                (QUEUED, error, now + delay, now, job_id),
+            )
+
+
+def make_job_store(backend: str, path: str | None = None) -> JobStore:
+    if backend == "memory":
+        return MemoryJobStore()
+
+    if backend == "sqlite":
+        if not path:
+            raise ValueError("A file path is required for the sqlite job backend")
+        return SQLiteJobStore(path)
+
+    raise ValueError(f"Unknown job backend: {backend}")
+
+
+class JobQueue:
+    """
+    Pool of asyncio workers draining a ``JobStore``.
+
+    ``handler`` receives the claimed job and returns a JSON-serialisable result.
+    Exceptions are retried until ``max_attempts`` is reached, then the job is marked
+    failed. Attempt ``n`` is retried after a jittered ``retry_base_delay * 2 ** (n - 1)``
+    seconds, capped at ``retry_max_delay``. Workers wake up immediately for jobs
+    submitted in this process and poll the store for jobs submitted or released
+    elsewhere.
+
+    Store calls run in a thread: a SQLite store may wait up to its busy timeout for
+    another worker's write.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: Callable[[Dict], Awaitable[Any]],
+        workers: int = 4,
+        lease_seconds: float = 300,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        retry_base_delay: float = 5.0,
+        retry_max_delay: float = 120.0,
+    ):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def submit(self, user_id: str, payload: Dict) -> Dict:
+        job = await asyncio.to_thread(self.store.create, user_id, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    def retry_delay(self, attempts: int) -> float:
+        # Half fixed, half random: spread out, but never straight back into the queue.
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def start(self):
+        if self._tasks:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _work(self):
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim, self.lease_seconds)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                result = await self.handler(job)
+            except asyncio.CancelledError:
+                # Shutting down: hand the job back so it is not stuck until the lease
+                # expires. Synchronous, as the task is being cancelled.
+                self.store.release(job["id"], "Interrupted by shutdown")
+                raise
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if job["attempts"] >= self.max_attempts:
+                    await asyncio.to_thread(self.store.finish, job["id"], FAILED, None, error)
+                else:
+                    await asyncio.to_thread(self.store.release, job["id"], error, self.retry_delay(job["attempts"]))
+                continue
+
+            await asyncio.to_thread(self.store.finish, job["id"], DONE, result)
@@ -0,0 +1,215 @@
+"""
+Structured logging that never blocks a request on stdout.
+
+``get_logger(__name__)`` returns a logger taking a message plus keyword fields:
+
+    log.info("Resume generated", user_id=user_id, cached=False)
+    log.debug("Generating resume", template="modern-2", sample=True)
+
+A record is put on a bounded queue and written by a background thread; when the
+queue is full the record is dropped and counted rather than waited on. Debug calls
+that pass ``sample`` are kept for a fraction of calls (``LOG_DEBUG_SAMPLE_RATE``, or
+the rate given), decided before anything is built; sample only noisy payload logs,
+never token counts or usage. Field values whose key names a secret (token,
+password, cookie...) and anything shaped like a JWT or an API key are redacted
+when the record is written.
+
+Nothing is set up on import: the application's lifespan (or a script's entry
+point) calls ``configure_logging`` on start and ``stop_logging`` on shutdown.
+"""
+from core.config import settings
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict
+import atexit
+import datetime
+import json
+import logging
+import queue
+import random
+import re
+import sys
+
+# A field is redacted when a word of its key is one of these: "access_token" and
+# "api_key" are, "input_tokens" is not.
+SECRET_WORDS = {"password", "passwd", "secret", "token", "cookie", "cookies", "authorization", "jwt", "apikey"}
+KEY_WORDS_RE = re.compile(r"[^a-z0-9]+")
+
+# Libraries that log every HTTP request at INFO.
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+SECRET_VALUE_RE = re.compile(
+    r"eyJ[\w-]+\.eyJ[\w-]+\.[\w-]+"  # JWT
+    r"|sk-[\w-]{16,}"  # OpenAI key
+)
+
+REDACTED = "[redacted]"
+
+def _is_secret(key: str) -> bool:
+    words = KEY_WORDS_RE.split(key.lower())
+    return "".join(words) in SECRET_WORDS or any(word in SECRET_WORDS for word in words)
+
+
+def redact(value: Any, key: str = "") -> Any:
+    if key and _is_secret(key):
+        return REDACTED
+    if isinstance(value, str):
+        return SECRET_VALUE_RE.sub(REDACTED, value)
+    if isinstance(value, dict):
+        return {k: redact(v, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [redact(item) for item in value]
+    return value
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, then the fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+        }
+        entry.update(redact(getattr(record, "fields", None) or {}))
+        if record.exc_info:
+            entry["exception"] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """``time LEVEL logger: message key=value ...`` for reading in a terminal."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        time = datetime.datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3]
+        fields = " ".join(f"{key}={value}" for key, value in redact(getattr(record, "fields", None) or {}).items())
+        line = f"{time} {record.levelname:<7} {record.name}: {redact(record.getMessage())}"
+        if fields:
+            line += " " + fields
+        if record.exc_info:
+            line += "\n" + redact(self.formatException(record.exc_info))
+        return line
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Enqueues without waiting and without formatting: the listener thread formats.
+    Only the message is resolved here, and the fields copied, so later changes to
+    the caller's objects do not show up in the log.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = dict(fields)
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class Logger:
+    """A ``logging.Logger`` taking keyword fields instead of ``%`` arguments."""
+
+    __slots__ = ("_logger",)
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(name)
+
+    def _log(self, level: int, msg: str, fields: Dict[str, Any], exc_info=None):
+        if not self._logger.isEnabledFor(level):
+            return
+        if exc_info is True:
+            exc_info = sys.exc_info()
+        # Built directly: ``Logger.log`` walks the stack for a source line the
+        # formatters never print, which costs more than the rest of the call.
+        record = self._logger.makeRecord(self._logger.name, level, "", 0, msg, None, exc_info, extra={"fields": fields})
+        self._logger.handle(record)
+
+    def debug(self, msg: str, sample: bool | float = False, **fields):
+        """With ``sample``, only that share of calls (True: LOG_DEBUG_SAMPLE_RATE) is logged."""
+        if not self._logger.isEnabledFor(logging.DEBUG):
+            return
+        if sample:
+            rate = settings.LOG_DEBUG_SAMPLE_RATE if sample is True else sample
+            if random.random() >= rate:
+                return
+            fields["sample_rate"] = rate
+        self._log(logging.DEBUG, msg, fields)
+
+    def info(self, msg: str, **fields):
+        self._log(logging.INFO, msg, fields)
+
+    def warning(self, msg: str, **fields):
+        self._log(logging.WARNING, msg, fields)
+
+    def error(self, msg: str, **fields):
+        self._log(logging.ERROR, msg, fields)
+
+    def exception(self, msg: str, **fields):
+        """``error`` with the exception being handled; its traceback is formatted by the writer thread."""
+        self._log(logging.ERROR, msg, fields, exc_info=True)
+
+
+def get_logger(name: str) -> Logger:
+    return Logger(name)
+
+
+_handler: DroppingQueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+def configure_logging():
+    """Route the root logger through the queue and start the writer thread."""
+    global _handler, _listener
+
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=False)
+
+    # Neither formatter prints the thread, process or task a record came from, and
+    # looking them up is most of the cost of creating a record.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.logAsyncioTasks = False
+
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root.addHandler(_handler)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Write out everything still queued, stop the writer thread and detach the queue."""
+    global _handler, _listener
+
+    if _listener is not None:
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _handler = _listener = None
+
+
+def stats() -> dict:
+    return {
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+    }
@@ -0,0 +1,168 @@
+"""
+Latency histograms exposed at ``/metrics`` in the Prometheus text format.
+
+Recording an observation finds its bucket with a bisect and bumps two counters
+under the histogram's lock; cumulative bucket counts and the text format are only
+produced when ``/metrics`` is scraped, so nothing is formatted or allocated per
+request when nobody is scraping.
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+import threading
+import time
+
+# Seconds; covers a cached Appwrite read up to a slow LLM generation.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Timer:
+    """``with histogram.time(...)``: observes the block's duration, also when it raises."""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels: str) -> _Timer:
+        return _Timer(self, labels)
+
+    def collect(self) -> Iterable[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+
+        yield f"# HELP {self.name} {_escape(self.documentation)}"
+        yield f"# TYPE {self.name} histogram"
+        for values, counts, total in sorted(series):
+            pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labels, values)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = ",".join(pairs + [f'le="{_format_float(bound)}"'])
+                yield f"{self.name}_bucket{{{labels}}} {cumulative}"
+            labels = "{" + ",".join(pairs) + "}" if pairs else ""
+            yield f"{self.name}_sum{labels} {_format_float(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Histogram] = []
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.collect()) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ["method", "route", "status"],
+)
+appwrite_request_seconds = registry.histogram(
+    "appwrite_request_duration_seconds",
+    "Appwrite REST calls, including the wait for a connection slot.",
+    ["operation", "collection", "status"],
+)
+llm_seconds = registry.histogram(
+    "resume_generation_duration_seconds",
+    "Stages of resume generation: prompt input, LLM invocation, parsing.",
+    ["stage", "template"],
+)
+render_seconds = registry.histogram(
+    "render_duration_seconds",
+    "PDF and DOCX rendering, including the wait for a render worker.",
+    ["kind", "outcome"],
+)
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware timing every HTTP request by its route, so
+    ``/api/v1/resume/get/{id}`` is one series however many ids are requested.
+    Requests that match no route are counted under ``unmatched``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_request_seconds.observe(time.perf_counter() - started, scope["method"], self._route(scope), str(status))
+
+    @staticmethod
+    def _route(scope) -> str:
+        route = scope.get("route")
+        template = getattr(route, "path", None)
+        if not template:
+            return "unmatched"
+        # FastAPI keeps the path a route was declared with; the prefixes of the
+        # routers it was included through are not part of it. Those are fixed
+        # segments, so they are taken from the front of the request path, and the
+        # parameters come from the template, never from the values requested.
+        parts = scope["path"].split("/")
+        prefix = len(parts) - len(template.split("/"))
+        if prefix <= 0:
+            return template
+        return "/".join(parts[:prefix + 1]) + template
@@ -0,0 +1,281 @@
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from typing import Dict, List, Optional, Tuple
+import io
+
+# Without reportlab's C accelerators, ASCII85-encoding the compressed page streams
+# costs more than laying the pages out; binary streams are also smaller.
+rl_config.useA85 = 0
+
+# Resume sections in reading order, with the heading printed for each.
+SECTIONS = (
+    ("professionalsummary", "Professional Summary"),
+    ("skills", "Skills"),
+    ("workexperience", "Work Experience"),
+    ("projects", "Projects"),
+    ("education", "Education"),
+    ("certifications", "Certifications"),
+)
+
+BULLET_PREFIXES = ("- ", "* ", "• ", "● ", "▪ ")
+
+Color = Tuple[float, float, float]
+
+
+class PdfLayout:
+    """Page geometry and typography of one template."""
+
+    def __init__(
+        self,
+        pagesize=letter,
+        margin: float = 54,
+        body_font: str = "Helvetica",
+        bold_font: str = "Helvetica-Bold",
+        body_size: float = 10,
+        leading: float = 13,
+        name_size: float = 20,
+        title_size: float = 11,
+        heading_size: float = 12,
+        heading_color: Color = (0, 0, 0),
+        heading_upper: bool = False,
+        heading_rule: bool = False,
+        centered_header: bool = False,
+        section_gap: float = 10,
+        bullet_indent: float = 12,
+        muted_color: Color = (0.35, 0.35, 0.35),
+        bullet: str = "•",
+    ):
+        self.pagesize = pagesize
+        self.margin = margin
+        self.body_font = body_font
+        self.bold_font = bold_font
+        self.body_size = body_size
+        self.leading = leading
+        self.name_size = name_size
+        self.title_size = title_size
+        self.heading_size = heading_size
+        self.heading_color = heading_color
+        self.heading_upper = heading_upper
+        self.heading_rule = heading_rule
+        self.centered_header = centered_header
+        self.section_gap = section_gap
+        self.bullet_indent = bullet_indent
+        self.muted_color = muted_color
+        self.bullet = bullet
+
+    @property
+    def width(self) -> float:
+        return self.pagesize[0] - 2 * self.margin
+
+
+LAYOUTS = {
+    "modern-1": PdfLayout(
+        heading_color=(0.12, 0.29, 0.53),
+        heading_rule=True,
+        name_size=22,
+    ),
+    "modern-2": PdfLayout(
+        heading_upper=True,
+        heading_size=11,
+        heading_rule=True,
+        centered_header=True,
+    ),
+    "modern-3": PdfLayout(
+        pagesize=A4,
+        margin=48,
+        body_font="Times-Roman",
+        bold_font="Times-Bold",
+        body_size=10.5,
+        leading=13.5,
+        name_size=18,
+        heading_size=12,
+        bullet="-",
+    ),
+}
+
+# Advance width of every character seen so far, per font, at size 1000. Standard
+# PDF fonts have no kerning, so a string's width is the sum of its characters'.
+_char_widths: Dict[str, Dict[str, float]] = {}
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    widths = _char_widths.get(font)
+    if widths is None:
+        widths = _char_widths[font] = {}
+
+    total = 0.0
+    for char in text:
+        width = widths.get(char)
+        if width is None:
+            width = widths[char] = stringWidth(char, font, 1000)
+        total += width
+
+    return total * size / 1000
+
+
+def wrap(text: str, font: str, size: float, max_width: float) -> List[str]:
+    """Greedy word wrap; words wider than the line are split between characters."""
+    space = text_width(" ", font, size)
+    lines = []
+    current: List[str] = []
+    current_width = 0.0
+
+    for word in text.split():
+        word_width = text_width(word, font, size)
+
+        if word_width > max_width:
+            if current:
+                lines.append(" ".join(current))
+                current, current_width = [], 0.0
+            piece = ""
+            for char in word:
+                if piece and text_width(piece + char, font, size) > max_width:
+                    lines.append(piece)
+                    piece = ""
+                piece += char
+            current, current_width = [piece], text_width(piece, font, size)
+            continue
+
+        if current and current_width + space + word_width > max_width:
+            lines.append(" ".join(current))
+            current, current_width = [word], word_width
+        else:
+            current_width += (space if current else 0) + word_width
+            current.append(word)
+
+    if current:
+        lines.append(" ".join(current))
+
+    return lines
+
+
+class _Pages:
+    """Positioned drawing operations, split into pages as the cursor moves down."""
+
+    def __init__(self, layout: PdfLayout):
+        self.layout = layout
+        self.top = layout.pagesize[1] - layout.margin
+        self.bottom = layout.margin + layout.body_size * 2
+        self.pages: List[list] = [[]]
+        self.y = self.top
+
+    def ensure(self, height: float):
+        if self.y - height < self.bottom and self.y < self.top:
+            self.pages.append([])
+            self.y = self.top
+
+    def text(self, x: float, text: str, font: str, size: float, leading: float, color: Optional[Color] = None, centered: bool = False, marker: Optional[str] = None):
+        self.ensure(leading)
+        self.y -= leading
+        if centered:
+            x = self.layout.margin + (self.layout.width - text_width(text, font, size)) / 2
+        if marker:
+            self.pages[-1].append(("text", self.layout.margin, self.y, marker, font, size, color))
+        self.pages[-1].append(("text", x, self.y, text, font, size, color))
+
+    def rule(self, color: Color):
+        self.pages[-1].append(("rule", self.layout.margin, self.y - 3, self.layout.margin + self.layout.width, color))
+        self.y -= 3
+
+    def space(self, height: float):
+        self.y -= height
+
+
+def layout_resume(resume: Dict, template: str = "modern-2") -> List[list]:
+    """Lay the resume fields out on pages; returns one list of drawing operations per page."""
+    layout = LAYOUTS.get(template, LAYOUTS["modern-2"])
+    pages = _Pages(layout)
+    left = layout.margin
+    centered = layout.centered_header
+
+    name = resume.get("name") or ""
+    for line in wrap(name, layout.bold_font, layout.name_size, layout.width):
+        pages.text(left, line, layout.bold_font, layout.name_size, layout.name_size * 1.2, centered=centered)
+
+    title = resume.get("title") or ""
+    for line in wrap(title, layout.body_font, layout.title_size, layout.width):
+        pages.text(left, line, layout.body_font, layout.title_size, layout.title_size * 1.4, layout.muted_color, centered=centered)
+
+    contact = " | ".join(resume[field] for field in ("email", "phone", "linkedin", "github") if resume.get(field))
+    for line in wrap(contact, layout.body_font, layout.body_size - 1, layout.width):
+        pages.text(left, line, layout.body_font, layout.body_size - 1, layout.leading, layout.muted_color, centered=centered)
+
+    for field, heading in SECTIONS:
+        body = resume.get(field)
+        if not body:
+            continue
+
+        pages.space(layout.section_gap)
+        # Keep the heading on the same page as at least two lines of its section.
+        pages.ensure(layout.heading_size * 1.5 + 2 * layout.leading)
+        pages.text(left, heading.upper() if layout.heading_upper else heading, layout.bold_font, layout.heading_size, layout.heading_size * 1.5, layout.heading_color)
+        if layout.heading_rule:
+            pages.rule(layout.heading_color)
+        pages.space(2)
+
+        for paragraph in body.split("\n"):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                pages.space(layout.leading / 2)
+                continue
+
+            if paragraph.startswith(BULLET_PREFIXES):
+                lines = wrap(paragraph[2:], layout.body_font, layout.body_size, layout.width - layout.bullet_indent)
+                for i, line in enumerate(lines):
+                    pages.text(left + layout.bullet_indent, line, layout.body_font, layout.body_size, layout.leading, marker=None if i else layout.bullet)
+            else:
+                for line in wrap(paragraph, layout.body_font, layout.body_size, layout.width):
+                    pages.text(left, line, layout.body_font, layout.body_size, layout.leading)
+
+    return pages.pages
+
+
+def render_resume_pdf(resume: Dict, template: str = "modern-2") -> io.BytesIO:
+    layout = LAYOUTS.get(template, LAYOUTS["modern-2"])
+    pages = layout_resume(resume, template)
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=layout.pagesize)
+    c.setTitle(resume.get("title") or "Resume")
+    c.setAuthor(resume.get("name") or "")
+
+    for number, operations in enumerate(pages, start=1):
+        # One text object per page: drawString would open and close one per line.
+        # Lines are written with textLine, which moves down by the body leading, so
+        # the origin is only set when the next line is not directly below; unlike
+        # textOut it also skips measuring the line again.
+        text = c.beginText()
+        font = None
+        color = None
+        for operation in operations:
+            if operation[0] == "text":
+                _, x, y, line, font_name, size, line_color = operation
+                if (font_name, size) != font:
+                    font = (font_name, size)
+                    text.setFont(font_name, size, layout.leading)
+                line_color = line_color or (0, 0, 0)
+                if line_color != color:
+                    color = line_color
+                    text.setFillColorRGB(*line_color)
+                if abs(x - text.getX()) > 0.01 or abs(y - text.getY()) > 0.01:
+                    text.setTextOrigin(x, y)
+                text.textLine(line)
+            else:
+                _, x1, y, x2, rule_color = operation
+                c.setStrokeColorRGB(*rule_color)
+                c.setLineWidth(0.6)
+                c.line(x1, y, x2, y)
+        c.drawText(text)
+
+        if len(pages) > 1:
+            c.setFont(layout.body_font, layout.body_size - 2)
+            c.setFillColorRGB(*layout.muted_color)
+            c.drawRightString(layout.pagesize[0] - layout.margin, layout.margin / 2, f"{number} / {len(pages)}")
+
+        c.showPage()
+
+    c.save()
+    buffer.seek(0)
+    return buffer
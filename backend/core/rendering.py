@@ -0,0 +1,266 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from core.config import settings
+from core.metrics import render_seconds
+from typing import Dict, List
+import asyncio
+import io
+import multiprocessing
+import signal
+import time
+import zipfile
+
+# Bump whenever render_pdf's or render_word's output for the same document changes,
+# so cached files are rebuilt.
+PDF_RENDERER_VERSION = "1"
+WORD_RENDERER_VERSION = "2"
+
+RENDERER_VERSIONS = {"pdf": PDF_RENDERER_VERSION, "docx": WORD_RENDERER_VERSION}
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+# reportlab and python-docx are imported by the render functions, which run in the
+# render pool's workers; the API process itself never needs them.
+
+def render_pdf(resume: Dict, template: str = "modern-2") -> io.BytesIO:
+    from core.pdf_layout import render_resume_pdf
+
+    return render_resume_pdf(resume, template)
+
+
+def render_word(resume: Dict) -> io.BytesIO:
+    from core.pdf_layout import BULLET_PREFIXES, SECTIONS
+    from docx import Document
+
+    buffer = io.BytesIO()
+    doc = Document()
+    # Looking a style up by name scans every style in the document, which used to
+    # dominate rendering; resolve each one once and set its id on the paragraphs.
+    style_ids = {name: doc.styles[name].style_id for name in ("Title", "Heading 1", "List Bullet")}
+
+    def add(text: str, style: str | None = None):
+        paragraph = doc.add_paragraph(text)
+        if style:
+            paragraph._p.get_or_add_pPr().style = style_ids[style]
+
+    if resume.get("name"):
+        add(resume["name"], "Title")
+    if resume.get("title"):
+        add(resume["title"])
+
+    contact = " | ".join(resume[field] for field in ("email", "phone", "linkedin", "github") if resume.get(field))
+    if contact:
+        add(contact)
+
+    for field, heading in SECTIONS:
+        body = resume.get(field)
+        if not body:
+            continue
+
+        add(heading, "Heading 1")
+        for line in body.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(BULLET_PREFIXES):
+                add(line[2:], "List Bullet")
+            else:
+                add(line)
+
+    doc.save(buffer)
+
+    buffer.seek(0)
+    return buffer
+
+
+def render_document(resume: Dict, kind: str, template: str = "modern-2") -> bytes:
+    """Render ``resume`` as ``kind`` ("pdf" or "docx")."""
+    if kind == "pdf":
+        return render_pdf(resume, template).getvalue()
+    if kind == "docx":
+        return render_word(resume).getvalue()
+    raise ValueError(f"Unknown document kind: {kind}")
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+WARMUP_RESUME = {
+    "name": "Warm Up",
+    "title": "Warm up",
+    "email": "warm@example.com",
+    "professionalsummary": "Loads fonts, templates and character widths.",
+    "skills": "- Python",
+}
+
+
+def _warm_worker():
+    # Runs once in every worker: the first render pays for reportlab's font
+    # metrics and python-docx's default template, not a user's request.
+    for template in ("modern-2", "modern-3"):
+        render_pdf(WARMUP_RESUME, template)
+    render_word(WARMUP_RESUME)
+
+
+def _on_alarm(signum, frame):
+    raise RenderTimeout("render timed out")
+
+
+def _render_job(resume: Dict, kind: str, template: str, timeout: float) -> bytes:
+    """Pool entry point: ``render_document`` under a timer that interrupts the worker."""
+    if not hasattr(signal, "setitimer"):
+        return render_document(resume, kind, template)
+
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return render_document(resume, kind, template)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class RenderPool:
+    """
+    Worker processes for PDF and DOCX rendering, which is CPU-bound and would hold
+    the GIL the event loop and request threads need.
+
+    Workers are spawned at startup with reportlab and python-docx imported and
+    warmed. At most ``workers + queue_size`` jobs are accepted at once; past that
+    ``render`` raises RenderQueueFull straight away (or waits, with ``wait=True``)
+    instead of letting a backlog build up behind a spike. A job running longer than
+    ``timeout`` is interrupted inside its worker and raises RenderTimeout.
+
+    Workers return the rendered file as ``bytes``, which pickle as one raw copy;
+    the parent writes that same object to the cache and the response.
+    """
+
+    def __init__(self, workers: int, queue_size: int, timeout: float):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(self.workers + self.queue_size)
+        self._in_flight = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the parent runs an event loop and several threads.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker
+            )
+        return self._executor
+
+    async def start(self):
+        """Spawn and warm every worker now rather than on the first requests."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, int) for _ in range(self.workers)))
+
+    async def render(self, resume: Dict, kind: str, template: str = "modern-2", wait: bool = False) -> bytes:
+        if not wait and self._slots.locked():
+            self.rejected += 1
+            render_seconds.observe(0.0, kind, "rejected")
+            raise RenderQueueFull("render queue is full")
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            data = await self._render(resume, kind, template)
+            outcome = "ok"
+        except RenderTimeout:
+            outcome = "timeout"
+            raise
+        finally:
+            render_seconds.observe(time.perf_counter() - started, kind, outcome)
+
+        self.completed += 1
+        return data
+
+    async def _render(self, resume: Dict, kind: str, template: str) -> bytes:
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(self._get_executor(), _render_job, resume, kind, template, self.timeout)
+                try:
+                    # The worker interrupts itself; this only catches one that is wedged.
+                    data = await asyncio.wait_for(future, self.timeout + 5)
+                except (RenderTimeout, asyncio.TimeoutError):
+                    self.timed_out += 1
+                    raise RenderTimeout(f"rendering took longer than {self.timeout}s")
+                except BrokenProcessPool:
+                    # A worker died (OOM, segfault); start over with fresh ones.
+                    self.shutdown()
+                    raise
+            finally:
+                self._in_flight -= 1
+
+        return data
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_size": self.queue_size,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+render_pool = RenderPool(settings.RENDER_WORKERS, settings.RENDER_QUEUE_SIZE, settings.RENDER_TIMEOUT)
+
+
+class ZipStream:
+    """
+    ZIP archive written incrementally: ``add`` and ``close`` return the bytes that
+    are ready to send, so only one member is held in memory at a time.
+
+    Members are stored, not deflated; PDF streams and DOCX files are already
+    compressed.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        # The archive sees an unseekable file, so every member carries a trailing
+        # data descriptor instead of having its header patched afterwards.
+        self._zip = zipfile.ZipFile(self, mode="w", compression=zipfile.ZIP_STORED)
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+    def add(self, name: str, data: bytes) -> bytes:
+        self._zip.writestr(name, data)
+        return self._drain()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._drain()
@@ -1,15 +1,90 @@
 from core.config import settings
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from openai import RateLimitError
-from core.prompts import RESUME_PROMPT
+from core.prompts import RESUME_PROMPTS, RESUME_HUMAN_PROMPT
+from schema.resumeSchema import TEMPLATES
+from core.scheduler import AIMDLimiter, FairScheduler
+from core.retry import RetryPolicy
+from core.cache import make_cache
+from core.tokens import TokenUsage, compact_input
+from core.metrics import llm_seconds
+from core.log import get_logger
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Iterator
+import asyncio
+import hashlib
+import json
 import os
 import re
+import time
+
+log = get_logger(__name__)
+
+SECTION_HEADERS = {
+    "professional summary": "professionalsummary",
+    "skills": "skills",
+    "work experience": "workexperience",
+    "projects": "projects",
+    "education": "education",
+    "certifications": "certifications",
+}
+
+# A header is a line holding only the section name, optionally decorated with
+# markdown emphasis, '#' or a trailing colon.
+SECTION_HEADER_RE = re.compile(
+    r"^[\s#*_]*(" + "|".join(SECTION_HEADERS) + r")[\s*_:]*$",
+    re.IGNORECASE,
+)
+
+INLINE_HEADER_RE = re.compile(
+    r"^[\s#*_]*(" + "|".join(SECTION_HEADERS) + r")[\s*_]*:\s*(\S.*)$",
+    re.IGNORECASE,
+)
+
+TITLE_RE = re.compile(r".+(Resume|CV)$", re.IGNORECASE)
+NAME_RE = re.compile(r"[A-Z][a-zA-Z\s]+")
+CONTACT_RE = re.compile(r"(Email|Phone|LinkedIn|GitHub):\s*([^|]+)")
+BULLETS_RE = re.compile(r"[•●▪▶✔✓✦➤➔]")
+
+# Shared by every generation in this worker: caps concurrent LLM calls and queues
+# the rest per user.
+generation_scheduler = FairScheduler(settings.LLM_MAX_IN_FLIGHT)
+
+# The scheduler's limit follows the provider's 429s between LLM_MIN_IN_FLIGHT and
+# LLM_MAX_IN_FLIGHT; failed calls are retried with backoff.
+llm_limiter = AIMDLimiter(
+    generation_scheduler,
+    settings.LLM_MIN_IN_FLIGHT,
+    settings.LLM_MAX_IN_FLIGHT,
+    decrease=settings.LLM_AIMD_DECREASE
+)
+llm_retry = RetryPolicy(settings.LLM_RETRY_ATTEMPTS, settings.LLM_RETRY_BASE_DELAY, settings.LLM_RETRY_MAX_DELAY)
+
+# Tokens the provider reports for every call, including prompt tokens read from its
+# prompt cache; attached to the LLM client as a callback.
+llm_usage = TokenUsage()
+
+# Raw model output keyed by a hash of everything that determines it, shared on disk
+# by all workers. It is SQLite, so the async paths call it on the threadpool.
+llm_cache = make_cache(
+    "sqlite",
+    ttl=settings.LLM_CACHE_TTL,
+    maxsize=settings.LLM_CACHE_MAXSIZE,
+    path=settings.LLM_CACHE_PATH,
+    max_bytes=settings.LLM_CACHE_MAX_BYTES
+) if settings.LLM_CACHE_ENABLED else None
+
+# langchain, langchain_openai and openai take seconds to import, so they are loaded
+# by the methods that need them: at startup through ``configure`` (see core.warmup)
+# or by the first generation, whichever comes first.
 
 class ResumeGenerator:
+    # Built once and shared by every request.
+    _llm = None
+    _chains: dict = {}
+
     @classmethod
-    def _get_llm(cls):
+    def _build_llm(cls):
+        from langchain_openai import ChatOpenAI
+
         openai_api_key = os.getenv("OPENAI_API_KEY")
         serviceurl = os.getenv("CHOREO_OPENAI_CONNECTION_SERVICEURL")
 
@@ -18,95 +93,336 @@ class ResumeGenerator:
                 model=settings.LLM_MODEL,
                 api_key=openai_api_key,
                 service_url=serviceurl,
+                max_retries=0,
+                stream_usage=True,
+                callbacks=[llm_usage.callback()],
             )
 
-        return ChatOpenAI(model=settings.LLM_MODEL, api_key=settings.OPENAI_API_KEY)
+        # Retries are ours (see _ainvoke) so that every 429 reaches llm_limiter.
+        # stream_usage makes streamed calls report token usage too.
+        return ChatOpenAI(
+            model=settings.LLM_MODEL,
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,
+            stream_usage=True,
+            callbacks=[llm_usage.callback()],
+        )
 
     @classmethod
-    def generate_resume(cls, user_input: dict) -> dict:
-        llm = cls._get_llm()
+    def _build_chain(cls, llm, template: str):
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+
         parser = StrOutputParser()
 
         prompt = ChatPromptTemplate.from_messages(
             [
-                ("system", RESUME_PROMPT),
-                ("human", "Here is the user input JSON:\n{user_input}\n\nGenerate the resume accordingly."),
+                ("system", RESUME_PROMPTS.get(template, RESUME_PROMPTS["modern-2"])),
+                ("human", RESUME_HUMAN_PROMPT),
             ]
         )
 
-        chain = prompt | llm | parser
-        
+        return prompt | llm | parser
+
+    @classmethod
+    def configure(cls):
+        """
+        Build the LLM client and one chain per template. The client keeps its HTTP
+        connection pool for the life of the process.
+        """
+        llm = cls._build_llm()
+        chains = {template: cls._build_chain(llm, template) for template in TEMPLATES}
+
+        # Swap both at once; requests already running keep the chain they started with.
+        cls._llm, cls._chains = llm, chains
+
+    @classmethod
+    def _get_llm(cls):
+        if cls._llm is None:
+            cls.configure()
+        return cls._llm
+
+    @classmethod
+    def _get_chain(cls, template: str = "modern-2"):
+        if not cls._chains:
+            cls.configure()
+
+        chain = cls._chains.get(template)
+        if chain is None:
+            chain = cls._chains[template] = cls._build_chain(cls._get_llm(), template)
+        return chain
+
+    @classmethod
+    async def agenerate_resume(cls, user_input: dict, user_id: str | None = None, use_cache: bool = True) -> dict:
+        """
+        Generates a resume: waits for a slot in ``generation_scheduler`` and then
+        awaits ``chain.ainvoke`` without holding a worker thread. Rate limits and
+        transient provider errors are retried (see ``_ainvoke``).
+
+        Identical requests are answered from ``llm_cache`` unless ``use_cache`` is off;
+        the returned dict carries ``cached`` either way.
+        """
+        from openai import APIError
+
+        cache_key = cls._cache_key(user_input) if use_cache and llm_cache else None
+        cached = await run_in_threadpool(llm_cache.get, cache_key) if cache_key else None
+        if cached is not None:
+            resume = cls._parse_resume(cached["text"], user_input)
+            resume["cached"] = True
+            return resume
+
+        chain = cls._get_chain(cls._template(user_input))
+
         try:
-            resume_text = chain.invoke({"user_input": str(user_input)})
-        except RateLimitError as e:
-            return {"error": "Rate limit reached. Please check billing or try again later."}
+            resume_text, seconds = await cls._ainvoke(
+                chain, {"user_input": cls._prompt_input(user_input)}, user_id, cls._template_label(cls._template(user_input))
+            )
+        except APIError as e:
+            return {"error": cls._error_message(e)}
+
+        if cache_key:
+            await run_in_threadpool(llm_cache.set, cache_key, {"text": resume_text, "seconds": seconds})
+
+        resume = cls._parse_resume(resume_text, user_input)
+        resume["cached"] = False
+        return resume
+
+    @classmethod
+    async def stream_resume(cls, user_input: dict, user_id: str | None = None, use_cache: bool = True) -> AsyncIterator[tuple[str, str | dict]]:
+        """
+        Stream the resume as the model writes it.
+
+        Yields ``("token", text)`` for every chunk, ``("section", name)`` as soon as a
+        section header line is complete, and finally ``("resume", sections)`` with the
+        same dict ``agenerate_resume`` returns. A cache hit arrives as a single token.
+        """
+        from openai import APIError, RateLimitError
 
-        template = user_input.get("template", "modern-2").lower()
-        resume_text = cls._postprocess_resume(resume_text, template)
+        cache_key = cls._cache_key(user_input) if use_cache and llm_cache else None
+        cached = await run_in_threadpool(llm_cache.get, cache_key) if cache_key else None
+        if cached is not None:
+            yield "token", cached["text"]
+            for header in cached["text"].split("\n"):
+                section = cls._match_section_header(header)
+                if section:
+                    yield "section", section
 
-        resume_obj = cls._extract_resume_sections(resume_text)
-        return resume_obj
+            resume = cls._parse_resume(cached["text"], user_input)
+            resume["cached"] = True
+            yield "resume", resume
+            return
+
+        chain = cls._get_chain(cls._template(user_input))
+        payload = {"user_input": cls._prompt_input(user_input)}
+        chunks = []
+        line = ""
+        attempt = 0
+
+        while True:
+            attempt += 1
+            async with generation_scheduler.slot(user_id):
+                epoch = llm_limiter.epoch
+                started = time.perf_counter()
+                try:
+                    async for chunk in chain.astream(payload):
+                        if not chunk:
+                            continue
+
+                        chunks.append(chunk)
+                        yield "token", chunk
+
+                        line += chunk
+                        *complete, line = line.split("\n")
+                        for header in complete:
+                            section = cls._match_section_header(header)
+                            if section:
+                                yield "section", section
+                except APIError as e:
+                    if isinstance(e, RateLimitError):
+                        llm_limiter.on_rate_limited(epoch)
+
+                    # Tokens already sent cannot be taken back, so only retry a stream
+                    # that failed before its first chunk.
+                    delay = None if chunks else llm_retry.delay(attempt, e)
+                    if delay is None:
+                        yield "resume", {"error": cls._error_message(e)}
+                        return
+                else:
+                    llm_limiter.on_success()
+                    break
+                finally:
+                    # From the request to the last chunk, including the client reading it.
+                    llm_seconds.observe(time.perf_counter() - started, "stream", cls._template_label(cls._template(user_input)))
+
+            await asyncio.sleep(delay)
+
+        section = cls._match_section_header(line)
+        if section:
+            yield "section", section
+
+        resume_text = "".join(chunks)
+        if cache_key:
+            await run_in_threadpool(llm_cache.set, cache_key, {"text": resume_text, "seconds": time.perf_counter() - started})
+
+        resume = cls._parse_resume(resume_text, user_input)
+        resume["cached"] = False
+        yield "resume", resume
+
+    @classmethod
+    async def _ainvoke(cls, chain, payload: dict, user_id: str | None, template: str = "other") -> tuple[str, float]:
+        """
+        Run ``chain`` in a scheduler slot, retrying per ``llm_retry``. The slot is
+        released while backing off. Returns the text and the duration of the
+        successful attempt.
+        """
+        from openai import APIError, RateLimitError
+
+        attempt = 0
+        while True:
+            attempt += 1
+            async with generation_scheduler.slot(user_id):
+                epoch = llm_limiter.epoch
+                started = time.perf_counter()
+                try:
+                    resume_text = await chain.ainvoke(payload)
+                except APIError as e:
+                    llm_seconds.observe(time.perf_counter() - started, "invoke", template)
+                    if isinstance(e, RateLimitError):
+                        llm_limiter.on_rate_limited(epoch)
+
+                    delay = llm_retry.delay(attempt, e)
+                    if delay is None:
+                        raise
+                else:
+                    llm_limiter.on_success()
+                    seconds = time.perf_counter() - started
+                    llm_seconds.observe(seconds, "invoke", template)
+                    return resume_text, seconds
+
+            await asyncio.sleep(delay)
 
     @staticmethod
-    def _extract_resume_sections(text: str) -> dict:
-        sections = {}
+    def _error_message(e: Exception) -> str:
+        from openai import RateLimitError
 
-        title_match = re.search(r"^(.+(Resume|CV))\s*$", text, re.MULTILINE | re.IGNORECASE)
-        sections["title"] = title_match.group(1).strip() if title_match else None
+        if isinstance(e, RateLimitError):
+            return "Rate limit reached. Please check billing or try again later."
+        return "The language model could not generate the resume. Please try again later."
 
-        name_match = re.search(r"^(?!.*(Resume|CV))([A-Z][a-zA-Z\s]+)$", text, re.MULTILINE)
-        sections["name"] = name_match.group(2).strip() if name_match else None
+    @classmethod
+    def _parse_resume(cls, resume_text: str, user_input: dict) -> dict:
+        template = cls._template(user_input)
+        # Post-processing runs line by line inside the parse, so the two are timed together.
+        with llm_seconds.time("parse", cls._template_label(template)):
+            return cls._extract_resume_sections(resume_text, template)
 
-        email_match = re.search(r"Email:\s*([^|\n]+)", text)
-        phone_match = re.search(r"Phone:\s*([^|\n]+)", text)
-        sections["email"] = email_match.group(1).strip() if email_match else None
-        sections["phone"] = phone_match.group(1).strip() if phone_match else None
+    @classmethod
+    def _prompt_input(cls, user_input: dict) -> str:
+        """
+        The input as compact JSON within the token budgets of ``core.tokens``. The
+        template is left out: the system prompt already is the template's.
+        """
+        with llm_seconds.time("prompt", cls._template_label(cls._template(user_input))):
+            text, tokens, truncated = compact_input({key: value for key, value in user_input.items() if key != "template"})
+        log.info("Resume prompt input", template=cls._template(user_input), tokens=tokens, truncated=truncated)
+        return text
 
-        linkedin_match = re.search(r"LinkedIn:\s*([^\|]+)", text)
-        github_match = re.search(r"GitHub:\s*([^\n]+)", text)
-        sections["linkedin"] = linkedin_match.group(1).strip() if linkedin_match else None
-        sections["github"] = github_match.group(1).strip() if github_match else None
+    @staticmethod
+    def _template(user_input: dict) -> str:
+        return (user_input.get("template") or "modern-2").lower()
 
-        def extract_section(header, next_headers):
-            pattern = rf"{header}\n(.+?)(?=\n(?:{'|'.join(next_headers)}|$))"
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-            return match.group(1).strip() if match else None
+    @staticmethod
+    def _template_label(template: str) -> str:
+        # Metric label; the template comes from the request, so only known ones get their own.
+        return template if template in TEMPLATES else "other"
 
-        sections["professionalsummary"] = extract_section("Professional Summary", ["Skills", "Work Experience", "Projects", "Education", "Certifications"])
-        sections["skills"] = extract_section("Skills", ["Work Experience", "Projects", "Education", "Certifications"])
-        sections["workexperience"] = extract_section("Work Experience", ["Projects", "Education", "Certifications"])
-        sections["projects"] = extract_section("Projects", ["Education", "Certifications"])
-        sections["education"] = extract_section("Education", ["Certifications"])
-        sections["certifications"] = extract_section("Certifications", [])
+    @staticmethod
+    def _normalize_input(value):
+        if isinstance(value, dict):
+            return {key: ResumeGenerator._normalize_input(value[key]) for key in sorted(value)}
+        if isinstance(value, list):
+            return [ResumeGenerator._normalize_input(item) for item in value]
+        if isinstance(value, str):
+            return " ".join(value.split())
+        return value
 
-        return sections
+    @classmethod
+    def _cache_key(cls, user_input: dict) -> str:
+        payload = json.dumps(
+            {
+                "model": settings.LLM_MODEL,
+                "system": RESUME_PROMPTS.get(cls._template(user_input), RESUME_PROMPTS["modern-2"]),
+                "human": RESUME_HUMAN_PROMPT,
+                "input": cls._normalize_input(user_input),
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return "llm:" + hashlib.sha256(payload.encode()).hexdigest()
 
     @staticmethod
-    def _postprocess_resume(text: str, template: str) -> str:
+    def _match_section_header(line: str) -> str | None:
+        match = SECTION_HEADER_RE.match(line)
+        return SECTION_HEADERS[match.group(1).lower()] if match else None
 
-        if template == "modern-1":
+    @classmethod
+    def _extract_resume_sections(cls, text: str, template: str = "") -> dict:
+        """
+        Split the resume into the ``ResumeOutputSchema`` fields in a single pass over
+        its lines, applying the template's line clean-up on the way.
 
-            lines = text.splitlines()
-            short_lines = []
-            for line in lines:
-                if len(line.strip()) > 200:
-                    line = line[:200] + "..."
-                short_lines.append(line)
-            return "\n".join(short_lines)
+        Title and name come from the lines before the first section header; contact
+        details are taken from the first line that carries them. Sections may appear in
+        any order and run until the next header.
+        """
+        sections = dict.fromkeys(("title", "name", "email", "phone", "linkedin", "github"))
+        bodies = {field: [] for field in SECTION_HEADERS.values()}
+        current = None
 
-        elif template == "modern-2":
-            text = re.sub(r"(Summary|Skills|Experience|Projects|Education)", r"\n\1", text)
-            return text
+        for line in cls._postprocess_lines(text, template):
+            header = SECTION_HEADER_RE.match(line)
+            if header is None and template == "modern-2":
+                # The model sometimes runs the header into its first line ("Skills: Python, ...").
+                inline = INLINE_HEADER_RE.match(line)
+                if inline is not None:
+                    current = SECTION_HEADERS[inline.group(1).lower()]
+                    bodies[current].append(inline.group(2))
+                    continue
 
-        elif template == "modern-3":
-            text = re.sub(r"[•●▪▶✔✓✦➤➔]", "-", text)
-            text = re.sub(r"[^\x00-\x7F]+", "", text)
-            return text.strip()
+            if header is not None:
+                current = SECTION_HEADERS[header.group(1).lower()]
+                continue
 
-        return text
-    
-    
-        
-            
+            if ":" in line:
+                for key, value in CONTACT_RE.findall(line):
+                    field = key.lower()
+                    if sections[field] is None:
+                        sections[field] = value.strip()
+
+            if current is not None:
+                bodies[current].append(line)
+                continue
+
+            stripped = line.strip()
+            if sections["title"] is None and TITLE_RE.match(stripped):
+                sections["title"] = stripped
+            elif sections["name"] is None and NAME_RE.fullmatch(stripped) and "Resume" not in stripped and "CV" not in stripped:
+                sections["name"] = stripped
+
+        for field, lines in bodies.items():
+            sections[field] = "\n".join(lines).strip() or None
+
+        return sections
+
+    @staticmethod
+    def _postprocess_lines(text: str, template: str) -> Iterator[str]:
+        if template == "modern-3":
+            # Character clean-up is cheaper over the whole text than line by line.
+            text = BULLETS_RE.sub("-", text).encode("ascii", "ignore").decode()
+
+        lines = text.splitlines()
+        if template == "modern-1":
+            return (line[:200] + "..." if len(line.strip()) > 200 else line for line in lines)
 
-    
\ No newline at end of file
+        return iter(lines)
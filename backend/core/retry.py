@@ -0,0 +1,68 @@
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import random
+import time
+
+
+def is_retryable(exc: BaseException) -> bool:
+    # Imported here: openai takes seconds to load and is only needed once a call
+    # has failed, by which point the client has loaded it anyway.
+    from openai import APIConnectionError, APIStatusError, InternalServerError, RateLimitError
+
+    # Failures worth another attempt: quota, provider overload and transport trouble.
+    # Anything else (bad request, auth, unknown model) fails the same way every time.
+    if isinstance(exc, (RateLimitError, InternalServerError, APIConnectionError)):
+        return True
+    # Some gateways answer 408/409 while the model itself is fine.
+    return isinstance(exc, APIStatusError) and exc.status_code in (408, 409)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from ``retry-after-ms`` or ``retry-after``."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        if "retry-after" in headers:
+            value = headers["retry-after"]
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+    return None
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff. Attempt ``n`` waits a random time in
+    ``[0, min(max_delay, base_delay * 2 ** (n - 1))]`` ("full jitter"), so callers
+    that failed together do not retry together. A ``Retry-After`` from the provider
+    replaces the exponential term, still with a little jitter on top; if it is longer
+    than ``max_delay`` the call gives up instead.
+    """
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, exc: BaseException) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up."""
+        if attempt >= self.max_attempts or not is_retryable(exc):
+            return None
+
+        requested = retry_after(exc)
+        if requested is not None:
+            if requested > self.max_delay:
+                # Retrying earlier than asked only earns another 429.
+                return None
+            return requested + random.uniform(0, min(self.base_delay, requested))
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
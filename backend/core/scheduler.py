@@ -0,0 +1,182 @@
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import time
+
+
+class FairScheduler:
+    """
+    Global in-flight limit with one FIFO queue per user.
+
+    When a slot frees up, waiting users are served round-robin, so one user queueing
+    many generations cannot starve everyone else. Waiting costs a single future per
+    request instead of a worker thread.
+    """
+
+    def __init__(self, max_in_flight: int, wait_samples: int = 1024):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._queues: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        self._waiting = 0
+        self._waits: deque[float] = deque(maxlen=wait_samples)
+        self._completed = 0
+        self._max_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def queued(self, user_id: Optional[str] = None) -> int:
+        """How many of ``user_id``'s calls are waiting for a slot."""
+        queue = self._queues.get(user_id or "anonymous")
+        return len(queue) if queue else 0
+
+    @asynccontextmanager
+    async def slot(self, user_id: Optional[str] = None) -> AsyncIterator[None]:
+        await self.acquire(user_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, user_id: Optional[str] = None):
+        started = time.perf_counter()
+
+        if self.in_flight < self.max_in_flight and not self._waiting:
+            self.in_flight += 1
+            self._record_wait(0.0)
+            return
+
+        key = user_id or "anonymous"
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(future)
+        self._waiting += 1
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on.
+                self.release()
+            else:
+                self._discard(key, future)
+            raise
+
+        self._record_wait(time.perf_counter() - started)
+
+    def release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def set_limit(self, max_in_flight: int):
+        """
+        Change the in-flight limit. Raising it admits waiters straight away; lowering it
+        lets the calls already running finish and admits nobody until they do.
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._queues and self.in_flight < self.max_in_flight:
+            key, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            self._waiting -= 1
+
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def _discard(self, key: str, future: asyncio.Future):
+        queue = self._queues.get(key)
+        if queue is None or future not in queue:
+            return
+
+        queue.remove(future)
+        self._waiting -= 1
+        if not queue:
+            del self._queues[key]
+
+    def _record_wait(self, seconds: float):
+        self._waits.append(seconds)
+        self._completed += 1
+        self._max_wait = max(self._max_wait, seconds)
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queue_depth": self._waiting,
+            "queued_users": len(self._queues),
+            "admitted": self._completed,
+            "wait_seconds": {
+                "p50": waits[len(waits) // 2] if waits else 0.0,
+                "p99": waits[int(len(waits) * 0.99)] if waits else 0.0,
+                "max": self._max_wait,
+            },
+        }
+
+
+class AIMDLimiter:
+    """
+    Additive-increase/multiplicative-decrease control of a ``FairScheduler`` limit,
+    driven by the provider's rate-limit responses.
+
+    Every ``limit`` successful calls raise the limit by one, up to ``max_limit``. A
+    rate-limited call multiplies it by ``decrease``, down to ``min_limit``, but only
+    if the call started after the previous decrease: the other calls that were
+    already in flight at the old limit hit the same quota and should not shrink it
+    again.
+    """
+
+    def __init__(self, scheduler: FairScheduler, min_limit: int, max_limit: int, decrease: float = 0.5):
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+
+        self.scheduler = scheduler
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease = decrease
+        self.epoch = 0
+        self._successes = 0
+        self.rate_limited = 0
+        self.decreases = 0
+        scheduler.set_limit(self.max_limit)
+
+    @property
+    def limit(self) -> int:
+        return self.scheduler.max_in_flight
+
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self._successes = 0
+            self.scheduler.set_limit(self.limit + 1)
+
+    def on_rate_limited(self, started_epoch: int):
+        self.rate_limited += 1
+        if started_epoch != self.epoch:
+            return
+
+        self.epoch += 1
+        self.decreases += 1
+        self._successes = 0
+        self.scheduler.set_limit(max(self.min_limit, int(self.limit * self.decrease)))
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "rate_limited": self.rate_limited,
+            "decreases": self.decreases,
+        }
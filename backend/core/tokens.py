@@ -0,0 +1,206 @@
+from core.config import settings
+from core.log import get_logger
+from typing import Any, Dict, List, Tuple
+import json
+import re
+import threading
+import time
+
+log = get_logger(__name__)
+
+# Most tokens any one input field may use; everything else gets DEFAULT_FIELD_BUDGET.
+# The free-text sections carry the content; names, links and the title are short.
+FIELD_BUDGETS = {
+    "experience": 1500,
+    "projects": 800,
+    "education": 400,
+    "skills": 300,
+    "certifications": 300,
+}
+DEFAULT_FIELD_BUDGET = 100
+
+TRUNCATION_MARKER = " [truncated]"
+
+SPACES_RE = re.compile(r"[ \t\f\v ]+")
+BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+# After a failed load (tiktoken missing, BPE files not downloadable yet) wait this
+# long before trying again, so the hot path does not retry on every request.
+ENCODING_RETRY_SECONDS = 60.0
+
+_encodings: Dict[str, Any] = {}
+_encoding_failures: Dict[str, float] = {}
+_encoding_lock = threading.Lock()
+
+
+def _encoding(model: str):
+    """Load the model's tokenizer; raises if tiktoken or its BPE files are unavailable."""
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def load_encoding(model: str | None = None):
+    """Load and keep the model's tokenizer, raising if it cannot be loaded. Used by the warm-up."""
+    model = model or settings.LLM_MODEL
+    with _encoding_lock:
+        if model not in _encodings:
+            _encodings[model] = _encoding(model)
+            _encoding_failures.pop(model, None)
+        return _encodings[model]
+
+
+def get_encoding(model: str | None = None):
+    """The model's tokenizer, or None if it cannot be loaded right now.
+
+    Only a successful load is kept; a failure is retried after ENCODING_RETRY_SECONDS.
+    """
+    model = model or settings.LLM_MODEL
+    encoding = _encodings.get(model)
+    if encoding is not None:
+        return encoding
+    failed_at = _encoding_failures.get(model)
+    if failed_at is not None and time.monotonic() - failed_at < ENCODING_RETRY_SECONDS:
+        return None
+    try:
+        return load_encoding(model)
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; until it can, estimate.
+        _encoding_failures[model] = time.monotonic()
+        log.warning("Tokenizer unavailable, estimating token counts", model=model, error=str(e))
+        return None
+
+
+def count_tokens(text: str, encoding=None) -> int:
+    if encoding is None:
+        # About four characters per token for English text.
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, encoding=None) -> str:
+    """
+    ``text`` cut to at most ``max_tokens``, keeping its beginning; ``text`` itself
+    when it already fits. The cut falls on the last line break or sentence end in
+    the final quarter of what fits, or else on the last space, and is marked with
+    TRUNCATION_MARKER.
+    """
+    if count_tokens(text, encoding) <= max_tokens:
+        return text
+
+    keep = max(0, max_tokens - count_tokens(TRUNCATION_MARKER, encoding))
+    if encoding is None:
+        head = text[:keep * 4]
+    else:
+        head = encoding.decode(encoding.encode(text, disallowed_special=())[:keep])
+
+    floor = len(head) * 3 // 4
+    cut = max(head.rfind("\n", floor), head.rfind(". ", floor) + 1)
+    if cut <= floor:
+        cut = head.rfind(" ", floor)
+    if cut > floor:
+        head = head[:cut]
+
+    return head.rstrip() + TRUNCATION_MARKER
+
+
+def normalize_text(value: str) -> str:
+    """Collapse runs of spaces and blank lines; line breaks carry structure and stay."""
+    value = SPACES_RE.sub(" ", value.replace("\r\n", "\n").replace("\r", "\n"))
+    value = "\n".join(line.strip() for line in value.split("\n"))
+    return BLANK_LINES_RE.sub("\n\n", value).strip()
+
+
+def _compact(value, name: str, encoding, truncated: List[str]):
+    if isinstance(value, dict):
+        items = {key: _compact(item, key, encoding, truncated) for key, item in value.items()}
+        return {key: item for key, item in items.items() if item not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        items = [_compact(item, name, encoding, truncated) for item in value]
+        return [item for item in items if item not in (None, "", [], {})]
+    if isinstance(value, str):
+        text = normalize_text(value)
+        limited = truncate_tokens(text, FIELD_BUDGETS.get(name, DEFAULT_FIELD_BUDGET), encoding)
+        if limited is not text:
+            truncated.append(name)
+        return limited
+    return value
+
+
+def compact_input(user_input: Dict) -> Tuple[str, int, List[str]]:
+    """
+    The generation input as the model sees it: compact JSON without empty fields,
+    with whitespace normalized and every string held to its field's token budget.
+
+    Returns the JSON, its token count and the names of the fields that were cut.
+    """
+    encoding = get_encoding()
+    truncated: List[str] = []
+    data = _compact(user_input, "", encoding, truncated)
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return text, count_tokens(text, encoding), truncated
+
+
+class TokenUsage:
+    """
+    Running totals of the token usage chat models report; ``callback()`` is the
+    LangChain handler that feeds it.
+
+    ``cached_input`` counts prompt tokens the provider served from its prompt
+    cache (OpenAI's ``prompt_tokens_details.cached_tokens``); they are billed at a
+    discount and skip most of the prefill time.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.input = 0
+        self.cached_input = 0
+        self.output = 0
+        self._lock = threading.Lock()
+
+    def record(self, usage: Dict[str, Any]):
+        input_tokens = usage.get("input_tokens", 0)
+        cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        output_tokens = usage.get("output_tokens", 0)
+        with self._lock:
+            self.calls += 1
+            self.input += input_tokens
+            self.cached_input += cached
+            self.output += output_tokens
+
+        log.info("LLM usage", input_tokens=input_tokens, cached_input_tokens=cached, output_tokens=output_tokens)
+
+    def callback(self):
+        # langchain_core is imported with the LLM client, not with this module.
+        from langchain_core.callbacks import BaseCallbackHandler
+        from langchain_core.messages import AIMessage
+        from langchain_core.outputs import ChatGeneration
+
+        usage = self
+
+        class UsageCallback(BaseCallbackHandler):
+            # Only adds a few numbers; no need for a thread hop on the async path.
+            run_inline = True
+
+            def on_llm_end(self, response, **kwargs: Any):
+                try:
+                    generation = response.generations[0][0]
+                except IndexError:
+                    return
+                if isinstance(generation, ChatGeneration) and isinstance(generation.message, AIMessage) and generation.message.usage_metadata:
+                    usage.record(generation.message.usage_metadata)
+
+        return UsageCallback()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input,
+            "cached_input_tokens": self.cached_input,
+            "cached_ratio": self.cached_input / self.input if self.input else 0.0,
+            "output_tokens": self.output,
+        }
@@ -0,0 +1,101 @@
+from starlette.concurrency import run_in_threadpool
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+import time
+from core.log import get_logger
+
+log = get_logger(__name__)
+
+
+class Warmup:
+    """
+    Startup work that should not delay accepting connections: loading the heavy
+    libraries, building the LLM chains, spawning the render workers.
+
+    ``start`` runs the steps in order in the background; ``status`` reports which
+    are done, for the readiness probe. Until a step is done, whatever needs it still
+    works and loads it on first use, just more slowly.
+
+    A step that fails is retried, after ``retry_base_delay`` seconds doubling up to
+    ``retry_max_delay``, until it succeeds. The instance is ready once every
+    required step is done; an optional step still failing only marks it degraded.
+    """
+
+    def __init__(self, retry_base_delay: float = 1.0, retry_max_delay: float = 60.0):
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.steps: Dict[str, Callable[[], Awaitable]] = {}
+        self.required: Dict[str, bool] = {}
+        self.done: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.attempts: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def step(self, name: str, func: Callable, blocking: bool = False, required: bool = True):
+        """Add a step; ``blocking`` functions run on the threadpool."""
+        self.steps[name] = (lambda: run_in_threadpool(func)) if blocking else func
+        self.required[name] = required
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        delay = self.retry_base_delay
+        while True:
+            for name, step in self.steps.items():
+                if name not in self.done:
+                    await self._attempt(name, step)
+
+            if len(self.done) == len(self.steps):
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max_delay)
+
+    async def _attempt(self, name: str, step: Callable[[], Awaitable]):
+        self.attempts[name] = self.attempts.get(name, 0) + 1
+        started = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            self.errors[name] = str(e) or type(e).__name__
+            log.exception("Warm-up step failed", step=name, attempt=self.attempts[name], required=self.required[name])
+        else:
+            self.done[name] = time.perf_counter() - started
+            self.errors.pop(name, None)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self.done for name, required in self.required.items() if required)
+
+    @property
+    def degraded(self) -> bool:
+        return any(name in self.errors for name, required in self.required.items() if not required)
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "degraded": self.degraded,
+            "steps": {
+                name: {
+                    "done": name in self.done,
+                    "required": self.required[name],
+                    "attempts": self.attempts.get(name, 0),
+                    "seconds": self.done.get(name),
+                    "error": self.errors.get(name),
+                }
+                for name in self.steps
+            },
+        }
+
+
+warmup = Warmup()
@@ -1,7 +1,10 @@
 from fastapi import Depends
 from core.appwrite import database
+from core.log import get_logger
 from appwrite.services.databases import Databases
 
+log = get_logger(__name__)
+
 def create_database():
     try: 
         db = database()
@@ -10,10 +13,10 @@ def create_database():
             name = 'ai-builder',
             enabled = True
         )
-        print(f"Database created successfully: {result}")
+        log.info("Database created", database_id=result.get("$id"))
         return result
     except Exception as e:
-        print(f"Error creating database: {str(e)}")
+        log.exception("Error creating database")
         return {"error": str(e)}
 
 def get_databases():
@@ -21,5 +24,5 @@ def get_databases():
         db = database()
         return db.list()
     except Exception as e:
-        print(f"Error fetching databases: {str(e)}")
+        log.exception("Error fetching databases")
         return {"error": str(e)}
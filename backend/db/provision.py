@@ -0,0 +1,162 @@
+"""
+Create the Appwrite database and the collections declared in ``db.schema``.
+
+Provisioning reads what exists and creates only what is missing. All missing
+collections are created at once, then all of their missing attributes; each
+collection's indexes are created as soon as its attributes are available.
+Attributes that exist but differ from the declaration are reported, not changed:
+Appwrite cannot alter an attribute in place.
+
+Run it against an environment with ``python -m db.provision``, or set
+``APPWRITE_PROVISION_SCHEMA`` to have the API do it as a warm-up step.
+"""
+from appwrite.exception import AppwriteException
+from appwrite.query import Query
+from core.appwrite import AppwriteGateway, get_gateway, start_gateway, stop_gateway
+from core.config import settings
+from core.log import configure_logging, get_logger, stop_logging
+from db.schema import COLLECTIONS, Collection
+from typing import Awaitable, Callable, Dict, List
+import asyncio
+import json
+import time
+
+log = get_logger(__name__)
+
+# Appwrite's largest page; no collection has more attributes or indexes than this.
+LIST_LIMIT = 100
+
+
+class ProvisioningError(Exception):
+    pass
+
+
+async def _create(create: Awaitable) -> bool:
+    """False if it already existed, e.g. created by another instance at the same time."""
+    try:
+        await create
+    except AppwriteException as e:
+        if e.code == 409:
+            return False
+        raise
+    return True
+
+
+async def _wait_available(list_items: Callable[[], Awaitable[Dict]], field: str, keys: List[str], what: str, timeout: float):
+    """Appwrite builds attributes and indexes in the background; poll until all of ``keys`` are usable."""
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while True:
+        items = {item["key"]: item for item in (await list_items())[field]}
+        pending = []
+        for key in keys:
+            item = items.get(key, {})
+            status = item.get("status")
+            if status in ("failed", "stuck"):
+                raise ProvisioningError(f"{what} {key} is {status}: {item.get('error') or 'no details'}")
+            if status != "available":
+                pending.append(key)
+
+        if not pending:
+            return
+        if time.monotonic() > deadline:
+            raise ProvisioningError(f"{what}s not available after {timeout}s: {', '.join(pending)}")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+
+async def ensure_database(db: AppwriteGateway, database_id: str) -> bool:
+    try:
+        await db.get_database(database_id)
+        return False
+    except AppwriteException as e:
+        if e.code != 404:
+            raise
+    return await _create(db.create_database(database_id, "ai-builder", enabled=True))
+
+
+async def provision_collection(db: AppwriteGateway, database_id: str, collection: Collection, timeout: float = 120) -> Dict:
+    report = {"collection": collection.name, "id": collection.id, "created": False, "attributes": [], "indexes": [], "drift": {}}
+    queries = [Query.limit(LIST_LIMIT)]
+
+    try:
+        await db.get_collection(database_id, collection.id)
+    except AppwriteException as e:
+        if e.code != 404:
+            raise
+        report["created"] = await _create(db.create_collection(
+            database_id, collection.id, collection.name, permissions=[], document_security=True, enabled=True
+        ))
+
+    current = {attribute["key"]: attribute for attribute in (await db.list_attributes(database_id, collection.id, queries))["attributes"]}
+    missing = [attribute for attribute in collection.attributes if attribute.key not in current]
+    for attribute in collection.attributes:
+        if attribute.key in current:
+            changes = attribute.drift(current[attribute.key])
+            if changes:
+                report["drift"][attribute.key] = changes
+
+    created = await asyncio.gather(*(
+        _create(db.create_attribute(database_id, collection.id, attribute.type, attribute.params()))
+        for attribute in missing
+    ))
+    report["attributes"] = [attribute.key for attribute, new in zip(missing, created) if new]
+
+    # Documents can only be written, and indexes built, once attributes are available.
+    await _wait_available(
+        lambda: db.list_attributes(database_id, collection.id, queries),
+        "attributes", [attribute.key for attribute in collection.attributes], "Attribute", timeout
+    )
+
+    indexes = {index["key"] for index in (await db.list_indexes(database_id, collection.id, queries))["indexes"]}
+    missing_indexes = [index for index in collection.indexes if index.key not in indexes]
+    created = await asyncio.gather(*(
+        _create(db.create_index(database_id, collection.id, index.key, index.type, index.attributes, index.orders))
+        for index in missing_indexes
+    ))
+    report["indexes"] = [index.key for index, new in zip(missing_indexes, created) if new]
+
+    await _wait_available(
+        lambda: db.list_indexes(database_id, collection.id, queries),
+        "indexes", [index.key for index in collection.indexes], "Index", timeout
+    )
+
+    return report
+
+
+async def provision(db: AppwriteGateway | None = None, database_id: str | None = None, collections: List[Collection] | None = None, timeout: float = 120) -> Dict:
+    """
+    Bring the database in line with ``collections`` (every declared collection by
+    default); returns what was created and which attributes drifted.
+    """
+    db = db or get_gateway()
+    database_id = database_id or settings.APPWRITE_DATABASE_ID
+    started = time.perf_counter()
+
+    created_database = await ensure_database(db, database_id)
+    reports = await asyncio.gather(*(provision_collection(db, database_id, collection, timeout) for collection in collections or COLLECTIONS))
+
+    for report in reports:
+        for key, changes in report["drift"].items():
+            log.warning("Schema drift", collection=report["collection"], attribute=key, changes=changes)
+
+    return {
+        "database": database_id,
+        "created_database": created_database,
+        "collections": reports,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def _main():
+    configure_logging()
+    await start_gateway()
+    try:
+        print(json.dumps(await provision(), indent=2))
+    finally:
+        await stop_gateway()
+        stop_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
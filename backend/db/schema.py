@@ -0,0 +1,148 @@
+"""
+The Appwrite collections the backend uses, declared once. ``db.provision`` reads
+what exists and creates whatever is missing.
+
+Collection ids come from the ``APPWRITE_*_COLLECTION_ID`` settings rather than
+``unique()``, so provisioning the same environment twice finds everything in
+place the second time.
+"""
+from core.config import settings
+from typing import Dict, List, Optional, Sequence
+
+# Appwrite user ids are at most 36 characters, short enough to index in full.
+USER_ID_SIZE = 36
+
+
+class Attribute:
+    """
+    One attribute. ``type`` is the segment of Appwrite's create endpoint
+    (``string``, ``email``, ``url``, ``datetime``, ``integer``, ``boolean``...);
+    email and url attributes are stored as strings with that ``format``.
+    """
+
+    def __init__(self, key: str, type: str = "string", size: Optional[int] = None, required: bool = False, default=None, array: bool = False):
+        self.key = key
+        self.type = type
+        self.size = size
+        self.required = required
+        self.default = default
+        self.array = array
+
+    def params(self) -> Dict:
+        params = {"key": self.key, "required": self.required, "array": self.array}
+        if self.size is not None:
+            params["size"] = self.size
+        # Appwrite rejects a default on a required attribute.
+        if not self.required:
+            params["default"] = self.default
+        return params
+
+    def drift(self, current: Dict) -> List[str]:
+        """How the attribute Appwrite has differs from this declaration."""
+        if self.type in ("email", "url"):
+            expected, actual = ("string", self.type), (current.get("type"), current.get("format"))
+        else:
+            expected, actual = self.type, current.get("type")
+
+        changes = []
+        if actual != expected:
+            changes.append(f"type {actual} != {expected}")
+        if self.size is not None and current.get("size") != self.size:
+            changes.append(f"size {current.get('size')} != {self.size}")
+        if bool(current.get("required")) != self.required:
+            changes.append(f"required {current.get('required')} != {self.required}")
+        return changes
+
+
+class Index:
+    def __init__(self, key: str, attributes: Sequence[str], type: str = "key", orders: Optional[Sequence[str]] = None):
+        self.key = key
+        self.attributes = list(attributes)
+        self.type = type
+        self.orders = list(orders) if orders else None
+
+
+class Collection:
+    def __init__(self, setting: str, name: str, attributes: Sequence[Attribute], indexes: Sequence[Index] = ()):
+        self.setting = setting
+        self.name = name
+        self.attributes = list(attributes)
+        self.indexes = list(indexes)
+
+    @property
+    def id(self) -> str:
+        return getattr(settings, self.setting)
+
+
+# Every section of a profile, and every resume, is looked up by its owner's
+# user_id, so each collection stores it as an indexed string.
+def _owner() -> Attribute:
+    return Attribute("user_id", size=USER_ID_SIZE, required=False)
+
+
+def _owner_index() -> Index:
+    return Index("user_id", ["user_id"])
+
+
+COLLECTIONS = [
+    Collection("APPWRITE_USER_COLLECTION_ID", "users", [
+        Attribute("name", size=100, required=True),
+        Attribute("user_id", size=100, required=True),
+        Attribute("email", "email", required=True),
+        Attribute("bio", size=3000),
+        Attribute("number", size=35),
+        Attribute("linkedin", size=250),
+        Attribute("github", size=250),
+        Attribute("role", size=50, default="user"),
+    ], [_owner_index()]),
+    Collection("APPWRITE_EDUCATION_COLLECTION_ID", "education", [
+        Attribute("institution", size=225, required=True),
+        Attribute("degree", size=100, required=True),
+        Attribute("field_of_study", size=150, required=True),
+        Attribute("start_date", "datetime", required=True),
+        Attribute("end_date", "datetime"),
+        _owner(),
+    ], [_owner_index()]),
+    Collection("APPWRITE_EXPERIENCE_COLLECTION_ID", "experience", [
+        Attribute("company", size=150, required=True),
+        Attribute("role", size=100, required=True),
+        Attribute("description", size=1000),
+        Attribute("start_date", "datetime", required=True),
+        Attribute("end_date", "datetime"),
+        _owner(),
+    ], [_owner_index()]),
+    Collection("APPWRITE_SKILLS_COLLECTION_ID", "skills", [
+        Attribute("skill_name", size=100, required=True),
+        Attribute("proficiency", size=50),
+        _owner(),
+    ], [_owner_index()]),
+    Collection("APPWRITE_PROJECT_COLLECTION_ID", "projects", [
+        Attribute("title", size=150, required=True),
+        Attribute("description", size=500),
+        Attribute("link", "url"),
+        _owner(),
+    ], [_owner_index()]),
+    Collection("APPWRITE_RESUME_COLLECTION_ID", "resume", [
+        Attribute("title", size=150, required=True),
+        Attribute("template_id", size=50, required=True),
+        Attribute("pdf_url", "url"),
+        _owner(),
+    ], [_owner_index()]),
+    Collection("APPWRITE_CV_COLLECTION_ID", "curriculum_vitae", [
+        Attribute("title", size=100, required=True),
+        Attribute("template", size=50),
+        Attribute("name", size=250, required=True),
+        Attribute("email", "email", required=True),
+        Attribute("phone", size=25),
+        Attribute("linkedin", size=250),
+        Attribute("github", size=250),
+        Attribute("professionalsummary", size=1000000),
+        Attribute("skills", size=100000),
+        Attribute("workexperience", size=1000000),
+        Attribute("projects", size=1000000),
+        Attribute("education", size=1000000),
+        Attribute("certifications", size=1000000),
+        _owner(),
+        Attribute("error", size=5000),
+    ], [_owner_index()]),
+]
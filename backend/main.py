@@ -1,21 +1,45 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
 from routers import user, services
 from contextlib import asynccontextmanager
-from models.userModel import init_user_collection
+from core.appwrite import start_gateway, stop_gateway
+from core.resume_generator import ResumeGenerator
+from core.rendering import render_pool
+from core.tokens import load_encoding
+from core.warmup import warmup
+from core.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from core.log import configure_logging, stop_logging
+from db.provision import provision
 
-# @asynccontextmanager
-# async def lifespan(app: FastAPI):
-#     init_user_collection()
-#     print("User collection initialized at startup")
-    
-#     yield
-    
-#     print(App shutting down...")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    await start_gateway()
+    await services.generation_jobs.start()
+
+    # Loaded in the background so the server accepts connections right away;
+    # /ready answers 503 until every required step is done. Failed steps are
+    # retried. The LLM chains and the tokenizer also load on first use, so an
+    # instance without them yet still serves everything else, reported degraded.
+    if settings.APPWRITE_PROVISION_SCHEMA:
+        # Only creates what is missing, so every instance can run it.
+        warmup.step("schema", provision)
+    warmup.step("llm", ResumeGenerator.configure, blocking=True, required=False)
+    warmup.step("tokenizer", load_encoding, blocking=True, required=False)
+    warmup.step("render_pool", render_pool.start)
+    warmup.start()
+
+    yield
+
+    await warmup.stop()
+    await services.generation_jobs.stop()
+    await stop_gateway()
+    render_pool.shutdown()
+    stop_logging()
 
 app = FastAPI(
-    # lifespan=lifespan,
+    lifespan=lifespan,
     title="AI Resuming Builder",
     description="Api to generate cool and presentable resuming",
     version="1.0.0",
@@ -30,10 +54,23 @@ app.add_middleware(
     allow_methods=["POST", "GET", "PUT"],
     allow_headers=["*"],
 )
+# Added last so it is outermost and times everything, CORS preflights included.
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(user.router, prefix=settings.API_PREFIX)
 app.include_router(services.router, prefix=settings.API_PREFIX)
 
+@app.get("/ready")
+async def ready(response: Response):
+    status = warmup.status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
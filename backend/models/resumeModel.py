@@ -1,55 +1,42 @@
-from fastapi import HTTPException
-from core.appwrite import database
+from core.appwrite import get_gateway
+from core.cache import make_cache
+from appwrite.exception import AppwriteException
 from appwrite.query import Query
-from appwrite.services.databases import Databases
-from typing import Dict
+from typing import Dict, List
 from appwrite.permission import Permission
 from appwrite.role import Role
 from core.config import settings 
+from core.log import get_logger
+import asyncio
 
-def create_cv_collection(db_id: str):
-    try:
-        db = database()
-       
-        result = db.create_collection(
-            database_id=db_id,
-            collection_id="unique()",
-            name="curriculum_vitae",
-            permissions=[],
-            document_security=True,     
-            enabled=True
-        )
+log = get_logger(__name__)
 
-        collection_id = result["$id"]
+# What the resume list shows. The text sections can each run to a megabyte.
+RESUME_LIST_FIELDS = ["$id", "title", "template", "$createdAt", "$updatedAt"]
+# Appwrite's largest page.
+MAX_PAGE_SIZE = 100
 
-        db.create_string_attribute(db_id, collection_id, "title", 100, required=True)
-        db.create_string_attribute(db_id, collection_id, "name", 250, required=True)
-        db.create_email_attribute(db_id, collection_id, "email", required=True)
-        db.create_string_attribute(db_id, collection_id, "phone", 25, required=False)
-        db.create_string_attribute(db_id, collection_id, "linkedin", 250, required=False)
-        db.create_string_attribute(db_id, collection_id, "github", 250, required=False)
-        db.create_string_attribute(db_id, collection_id, "professionalsummary", 1000000, required=False)
-        db.create_string_attribute(db_id, collection_id, "skills", 100000, required=False)
-        db.create_string_attribute(db_id, collection_id, "workexperience", 1000000, required=False)
-        db.create_string_attribute(db_id, collection_id, "projects", 1000000, required=False)
-        db.create_string_attribute(db_id, collection_id, "education", 1000000, required=False)
-        db.create_string_attribute(db_id, collection_id, "certifications", 1000000, required=False)
-        db.create_string_attribute(db_id, collection_id, "user_id", 10000, required=False)
-        db.create_string_attribute(db_id, collection_id, "error", 5000, required=False)
+# Opening a resume and downloading it fetch the same document back to back.
+resume_cache = make_cache(
+    settings.RESUME_CACHE_BACKEND,
+    ttl=settings.RESUME_CACHE_TTL,
+    maxsize=settings.RESUME_CACHE_MAXSIZE,
+    path=settings.RESUME_CACHE_PATH
+)
 
+# resume_cache may be the SQLite backend: every call goes to a thread so disk I/O
+# never runs on the event loop.
+async def invalidate_resumes(user_id: str | None):
+    if user_id:
+        await asyncio.to_thread(resume_cache.delete_prefix, f"resume:{user_id.strip()}:")
 
-        return {"message": "Setup completed successfully", "collection_id": collection_id}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Setup failed: {str(e)}")
-
-def create_resume(inputData: Dict, db_id: str, collection_id: str, userId: str):
+async def create_resume(inputData: Dict, db_id: str, collection_id: str, userId: str):
     try:
         if not userId:
             raise ValueError("User ID is required to create document")
         
-        db = database()
-        cv = db.create_document(
+        db = get_gateway()
+        cv = await db.create_document(
             database_id=db_id,
             collection_id=collection_id,
             document_id="unique()",
@@ -60,59 +47,123 @@ def create_resume(inputData: Dict, db_id: str, collection_id: str, userId: str):
                 Permission.delete(Role.user(userId))
             ]
         )
+        await invalidate_resumes(userId)
         
         return cv
     except Exception as e:
-        print("Error occurred while creating user:", str(e))
+        log.exception("Error occurred while creating resume", user_id=userId)
         return None
 
-def get_curricullum_vitae(user_id: str):
+async def create_resumes(inputs: List[Dict], db_id: str, collection_id: str, userId: str):
+    """Write several resumes for one user with a single bulk request."""
     try:
-        db = database()
-        cv = db.list_documents(
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.APPWRITE_CV_COLLECTION_ID,
-            queries=[Query.equal("user_id", user_id)]
-        )["documents"]
-        
-        return cv
-    
+        if not userId:
+            raise ValueError("User ID is required to create document")
+
+        permissions = [
+            Permission.read(Role.user(userId)),
+            Permission.update(Role.user(userId)),
+            Permission.delete(Role.user(userId))
+        ]
+
+        db = get_gateway()
+        cvs = await db.create_documents(
+            database_id=db_id,
+            collection_id=collection_id,
+            documents=[{**inputData, "$id": "unique()", "$permissions": permissions} for inputData in inputs]
+        )
+        await invalidate_resumes(userId)
+
+        return cvs["documents"]
     except Exception as e:
-        print(str(e) or "Error fetching cv")
+        log.exception("Error occurred while creating resumes", user_id=userId, count=len(inputs))
         return None
 
-def get_single_curricullum_vitae(user_id: str, cv_id: str):
+async def list_curricullum_vitae(user_id: str, limit: int = 25, cursor: str | None = None, fields: List[str] | None = RESUME_LIST_FIELDS):
+    """
+    One page of a user's resumes, after the resume with id ``cursor``. Only
+    ``fields`` are returned; pass None for whole documents.
+    """
     try:
-        db = database()
-        cv = db.list_documents(
+        queries = [Query.equal("user_id", user_id), Query.limit(limit)]
+        if cursor:
+            queries.append(Query.cursor_after(cursor))
+        if fields:
+            queries.append(Query.select(fields))
+
+        db = get_gateway()
+        return await db.list_documents(
             database_id=settings.APPWRITE_DATABASE_ID,
             collection_id=settings.APPWRITE_CV_COLLECTION_ID,
-            queries=[
-                Query.equal("user_id", user_id),
-                Query.equal("$id", cv_id)
-            ]
+            queries=queries
         )
-        
-        documents = cv.get("documents", [])
-        return documents[0] if documents else None
+
+    except Exception as e:
+        log.exception("Error fetching resumes", user_id=user_id)
+        return None
+
+async def get_curricullum_vitae(user_id: str):
+    """Every resume of the user, whole, fetched a full page at a time."""
+    cv = []
+    cursor = None
+    while True:
+        page = await list_curricullum_vitae(user_id, limit=MAX_PAGE_SIZE, cursor=cursor, fields=None)
+        if page is None:
+            return None
+
+        cv.extend(page["documents"])
+        if len(page["documents"]) < MAX_PAGE_SIZE:
+            return cv
+        cursor = page["documents"][-1]["$id"]
+
+async def get_single_curricullum_vitae(user_id: str, cv_id: str):
+    """
+    The resume with id ``cv_id`` if it belongs to ``user_id``, else None. Fetched by
+    primary key and kept in ``resume_cache`` until a write by the user invalidates it.
+    """
+    try:
+        cache_key = f"resume:{user_id.strip()}:{cv_id}"
+        cached = await asyncio.to_thread(resume_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+        db = get_gateway()
+        try:
+            cv = await db.get_document(
+                database_id=settings.APPWRITE_DATABASE_ID,
+                collection_id=settings.APPWRITE_CV_COLLECTION_ID,
+                document_id=cv_id
+            )
+        except AppwriteException as e:
+            if e.code == 404:
+                return None
+            raise
+
+        # The API key can read every document; only the owner may see this one.
+        if cv.get("user_id") != user_id:
+            return None
+
+        await asyncio.to_thread(resume_cache.set, cache_key, cv)
+        return cv
         
     except Exception as e:
-        print(str(e) or "Error fetching cv")
+        log.exception("Error fetching resume", user_id=user_id, doc_id=cv_id)
         return None
     
-def delete_cv(db_id: str, collection_id: str, doc_id: str):
+async def delete_cv(db_id: str, collection_id: str, doc_id: str, user_id: str | None = None):
     try:
-        db = database()
-        db.delete_document(
+        db = get_gateway()
+        await db.delete_document(
             database_id = db_id,
             collection_id = collection_id,
             document_id = doc_id
         )
+        await invalidate_resumes(user_id)
 
         return {"message": "User deleted successfully"}
     
     except Exception as e:
-        print(str(e) or "Failed to delete cv")
+        log.exception("Failed to delete resume", doc_id=doc_id)
         return []
 
 
@@ -1,122 +1,35 @@
-from fastapi import HTTPException
-from core.appwrite import database
+from core.appwrite import get_gateway
+from core.cache import make_cache
 from appwrite.query import Query
-from appwrite.services.databases import Databases
-from typing import Dict
+from typing import Dict, Iterable
 from appwrite.permission import Permission
 from appwrite.role import Role
 from core.config import settings 
+from core.log import get_logger
+import asyncio
 
-def create_user_collection(db_id: str):
-    try:
-        db = database()
-       
-        result = db.create_collection(
-            database_id=db_id,
-            collection_id="unique()",
-            name="users",
-            permissions=[],
-            document_security=True,     
-            enabled=True
-        )
-
-        collection_id = result["$id"]
-
-        db.create_string_attribute(db_id, collection_id, "name", 100, required=True)
-        db.create_string_attribute(db_id, collection_id, "user_id", 100, required=True)
-        db.create_email_attribute(db_id, collection_id, "email", required=True)
-        db.create_string_attribute(db_id, collection_id, "bio", 3000, required=False)
-        db.create_string_attribute(db_id, collection_id, "number", 35, required=False)
-        db.create_string_attribute(db_id, collection_id, "linkedin", 250, required=False)
-        db.create_string_attribute(db_id, collection_id, "github", 250, required=False)
-        db.create_string_attribute(db_id, collection_id, "role", 50, required=False, default="user")
-
-        education = db.create_collection(db_id, "unique()", "education", permissions=[], document_security=True)
-        db.create_string_attribute(db_id, education["$id"], "institution", 225, required=True)
-        db.create_string_attribute(db_id, education["$id"], "degree", 100, required=True)
-        db.create_string_attribute(db_id, education["$id"], "field_of_study", 150, required=True)
-        db.create_datetime_attribute(db_id, education["$id"], "start_date", required=True)
-        db.create_datetime_attribute(db_id, education["$id"], "end_date", required=False)
-        db.create_relationship_attribute(
-            database_id=db_id,
-            collection_id=education["$id"],
-            related_collection_id=collection_id,
-            type="oneToOne",
-            two_way=False,
-            key="user_id"
-        )
+log = get_logger(__name__)
 
-        experience = db.create_collection(db_id, "unique()", "experience", permissions=[], document_security=True)
-        db.create_string_attribute(db_id, experience["$id"], "company", 150, required=True)
-        db.create_string_attribute(db_id, experience["$id"], "role", 100, required=True)
-        db.create_string_attribute(db_id, experience["$id"], "description", 1000, required=False)
-        db.create_datetime_attribute(db_id, experience["$id"], "start_date", required=True)
-        db.create_datetime_attribute(db_id, experience["$id"], "end_date", required=False)
-        db.create_relationship_attribute(
-            database_id=db_id,
-            collection_id=experience["$id"],
-            related_collection_id=collection_id,
-            type="oneToOne",
-            two_way=False,
-            key="user_id"
-        )
-
-        skills = db.create_collection(db_id, "unique()", "skills", permissions=[], document_security=True)
-        db.create_string_attribute(db_id, skills["$id"], "skill_name", 100, required=True)
-        db.create_string_attribute(db_id, skills["$id"], "proficiency", 50, required=False)
-        db.create_relationship_attribute(
-            database_id=db_id,
-            collection_id=skills["$id"],
-            related_collection_id=collection_id,
-            type="oneToOne",
-            two_way=False,
-            key="user_id"
-        )
-
-        projects = db.create_collection(db_id, "unique()", "projects", permissions=[], document_security=True)
-        db.create_string_attribute(db_id, projects["$id"], "title", 150, required=True)
-        db.create_string_attribute(db_id, projects["$id"], "description", 500, required=False)
-        db.create_url_attribute(db_id, projects["$id"], "link", required=False)
-        db.create_relationship_attribute(
-            database_id=db_id,
-            collection_id=projects["$id"],
-            related_collection_id=collection_id,
-            type="oneToOne",
-            two_way=False,
-            key="user_id"
-        )
-
-        resume = db.create_collection(db_id, "unique()", "resume", permissions=[], document_security=True)
-        db.create_string_attribute(db_id, resume["$id"], "title", 150, required=True)
-        db.create_string_attribute(db_id, resume["$id"], "template_id", 50, required=True)
-        db.create_url_attribute(db_id, resume["$id"], "pdf_url", required=False)
-        db.create_relationship_attribute(
-            database_id=db_id,
-            collection_id=resume["$id"],
-            related_collection_id=collection_id,
-            type="oneToOne",
-            two_way=False,
-            key="user_id"
-        )
-
-
-        return {"message": "All collections created successfully"}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Setup failed: {str(e)}")
-    
-def init_user_collection():
-    from core.config import settings
-    create_user_collection(settings.APPWRITE_DATABASE_ID)
+profile_cache = make_cache(
+    settings.PROFILE_CACHE_BACKEND,
+    ttl=settings.PROFILE_CACHE_TTL,
+    maxsize=settings.PROFILE_CACHE_MAXSIZE,
+    path=settings.PROFILE_CACHE_PATH
+)
 
+# profile_cache may be the SQLite backend: every call goes to a thread so disk I/O
+# never runs on the event loop.
+async def invalidate_profile(user_id: str | None):
+    if user_id:
+        await asyncio.to_thread(profile_cache.delete_prefix, f"profile:{user_id.strip()}:")
 
-def create_user(userData: Dict, db_id: str, collection_id: str, userId: str):
+async def create_user(userData: Dict, db_id: str, collection_id: str, userId: str):
     try:
         if not userId:
             raise ValueError("User ID is required to create document")
         
-        db = database()
-        user = db.create_document(
+        db = get_gateway()
+        user = await db.create_document(
             database_id=db_id,
             collection_id=collection_id,
             document_id="unique()",
@@ -127,68 +40,87 @@ def create_user(userData: Dict, db_id: str, collection_id: str, userId: str):
                 Permission.delete(Role.user(userId))
             ]
         )
+        await invalidate_profile(userId)
         
         return user
     except Exception as e:
-        print("Error occurred while creating user:", str(e))
+        log.exception("Error occurred while creating user", user_id=userId)
         return None
 
-def get_user_profile(user_id: str):
-    try:
-        db = database()
-        profile = db.list_documents(
+PROFILE_SECTIONS = {
+    "profile": "APPWRITE_USER_COLLECTION_ID",
+    "education": "APPWRITE_EDUCATION_COLLECTION_ID",
+    "experience": "APPWRITE_EXPERIENCE_COLLECTION_ID",
+    "skills": "APPWRITE_SKILLS_COLLECTION_ID",
+    "resume": "APPWRITE_RESUME_COLLECTION_ID",
+    "projects": "APPWRITE_PROJECT_COLLECTION_ID",
+}
+
+async def _get_profile_section(db, user_id: str, section: str, timeout: float):
+    return (await asyncio.wait_for(
+        db.list_documents(
             database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.APPWRITE_USER_COLLECTION_ID,
+            collection_id=getattr(settings, PROFILE_SECTIONS[section]),
             queries=[Query.equal("user_id", user_id)]
-        )["documents"]
+        ),
+        timeout=timeout
+    ))["documents"]
+
+async def get_user_profile(user_id: str, sections: Iterable[str] | None = None, timeout: float | None = None):
+    """
+    Fetch the requested profile sections concurrently.
+
+    Each collection query gets its own timeout. A section that fails or times out is
+    returned empty (``None`` for ``profile``) and listed under ``errors``; the call only
+    returns ``None`` when every requested section failed. Complete results are served
+    from ``profile_cache`` until the TTL expires or a write invalidates the user.
+
+    Raises ``ValueError`` for a section not in ``PROFILE_SECTIONS``.
+    """
+    sections = list(sections or PROFILE_SECTIONS)
+    unknown = [section for section in sections if section not in PROFILE_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown profile sections: {', '.join(unknown)}")
 
-        education = db.list_documents(
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.APPWRITE_EDUCATION_COLLECTION_ID,
-            queries=[Query.equal("user_id", user_id)]
-        )["documents"]
+    try:
+        cache_key = f"profile:{user_id.strip()}:sections:{','.join(sorted(sections))}"
+        cached = await asyncio.to_thread(profile_cache.get, cache_key)
+        if cached is not None:
+            return cached
 
-        experience = db.list_documents(
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.APPWRITE_EXPERIENCE_COLLECTION_ID,
-            queries=[Query.equal("user_id", user_id)]
-        )["documents"]
+        timeout = timeout or settings.APPWRITE_SECTION_TIMEOUT
+        db = get_gateway()
 
-        skills = db.list_documents(
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.APPWRITE_SKILLS_COLLECTION_ID,
-            queries=[Query.equal("user_id", user_id)]
-        )["documents"]
+        results = await asyncio.gather(
+            *(_get_profile_section(db, user_id, section, timeout) for section in sections),
+            return_exceptions=True
+        )
 
-        resume = db.list_documents(
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.APPWRITE_RESUME_COLLECTION_ID,
-            queries=[Query.equal("user_id", user_id)]
-        )["documents"]
+        user = {"errors": {}}
+        for section, result in zip(sections, results):
+            if isinstance(result, BaseException):
+                log.error("Error occurred while fetching profile section", user_id=user_id, section=section, error=str(result) or type(result).__name__)
+                user["errors"][section] = str(result) or type(result).__name__
+                result = []
 
-        projects = db.list_documents(
-            database_id=settings.APPWRITE_DATABASE_ID,
-            collection_id=settings.APPWRITE_PROJECT_COLLECTION_ID,
-            queries=[Query.equal("user_id", user_id)]
-        )["documents"]
+            user[section] = (result[0] if result else None) if section == "profile" else result
+
+        if len(user["errors"]) == len(sections):
+            return None
+
+        if not user["errors"]:
+            await asyncio.to_thread(profile_cache.set, cache_key, user)
+
+        return user
 
-        return {
-            "profile": profile[0] if profile else None,
-            "education": education,
-            "experience": experience,
-            "skills": skills,
-            "resume": resume,
-            "projects": projects
-        }
-            
     except Exception as e:
-        print(str(e) or "Error occurred while fetching user")
+        log.exception("Error occurred while fetching user", user_id=user_id)
         return None
 
-def get_all_users(db_id: str, collection_id: str):
+async def get_all_users(db_id: str, collection_id: str):
     try:
-        db = database() 
-        users = db.list_documents(
+        db = get_gateway() 
+        users = await db.list_documents(
             database_id = db_id,
             collection_id = collection_id,
             queries = []
@@ -197,41 +129,48 @@ def get_all_users(db_id: str, collection_id: str):
         return users
     
     except Exception as e:
-        print(str(e) or "Error occured while fetching users")
+        log.exception("Error occurred while fetching users")
         return []
 
 
-def update_users(db_id: str, collection_id: str, doc_id: str, userData: Dict):
+async def update_users(db_id: str, collection_id: str, doc_id: str, userData: Dict):
     try:
-        db = database()
-        user = db.update_document(
+        db = get_gateway()
+        user = await db.update_document(
             database_id = db_id,
             collection_id = collection_id,
             document_id = doc_id,
             data = userData,
         )
+        await invalidate_profile(user.get("user_id") if isinstance(user.get("user_id"), str) else None)
 
         return user
     
     except Exception as e:
-        print(str(e) or "Update profile file")
+        log.exception("Error occurred while updating user", doc_id=doc_id)
         return []
 
-def delete_users(db_id: str, collection_id: str, doc_id: str):
+async def delete_users(db_id: str, collection_id: str, doc_id: str, user_id: str | None = None):
     try:
-        db = database()
-        db.delete_document(
+        db = get_gateway()
+        if user_id is None:
+            # Look the owner up first so their cached profile can be dropped.
+            owner = (await db.get_document(db_id, collection_id, doc_id)).get("user_id")
+            user_id = owner if isinstance(owner, str) else None
+
+        await db.delete_document(
             database_id = db_id,
             collection_id = collection_id,
             document_id = doc_id
         )
+        await invalidate_profile(user_id)
 
         return {
             "message": "User deleted successfully"
         }
     
     except Exception as e:
-        print(str(e) or "Failed to delete user")
+        log.exception("Failed to delete user", doc_id=doc_id)
         return []
 
 
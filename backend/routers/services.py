@@ -1,31 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from schema.resumeSchema import ResumeInputSchema, ResumeOutputSchema
-from core.resume_generator import ResumeGenerator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from schema.resumeSchema import ResumeInputSchema, ResumeOutputSchema, ResumeJobSchema, ResumeBatchInputSchema, ResumeBatchOutputSchema, TEMPLATES
+from core.resume_generator import ResumeGenerator, generation_scheduler, llm_limiter, llm_usage
 from models.userModel import get_user_profile
-from typing import Dict
+from typing import Dict, List
 from api.auth import authenticate_user
-from models.resumeModel import create_resume, get_curricullum_vitae, get_single_curricullum_vitae, delete_cv, create_cv_collection
+from models.resumeModel import MAX_PAGE_SIZE, create_resume, create_resumes, list_curricullum_vitae, get_single_curricullum_vitae, delete_cv
 from core.config import settings 
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from docx import Document
+from core.jobs import JobQueue, make_job_store, FAILED
+from core.rendering import MEDIA_TYPES, RENDERER_VERSIONS, RenderQueueFull, RenderTimeout, ZipStream, render_pool
+from core.artifacts import ArtifactCache, artifact_key, etag_matches
+from core.log import get_logger, stats as log_stats
 import os, uuid
-import io
+import re
+import asyncio
+import json
+from collections import deque
+from datetime import datetime, timezone
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+log = get_logger(__name__)
 
 router = APIRouter( 
     prefix='/v1',
     tags=['users']
 ) 
-@router.post('/resume/create', response_model=ResumeOutputSchema)
-def generate_resume(data: ResumeInputSchema, current_user: Dict = Depends(authenticate_user)):
-    print('from function',current_user)
-    user = get_user_profile(current_user['userId'])
-    print(user)
-    user_info = user['profile']
-    print('tjis is user_info',user_info)
 
+def resume_fields(resume_doc: Dict, template: str) -> Dict:
+    if "resume" in resume_doc and not resume_doc.get("professionalsummary"):
+        # Documents saved as one block of text before it was split into fields.
+        return {**resume_doc, **ResumeGenerator._extract_resume_sections(resume_doc["resume"], template)}
+    return resume_doc
+
+def export_name(resume_doc: Dict, kind: str) -> str:
+    title = re.sub(r"[^A-Za-z0-9._-]+", "_", resume_doc.get("title") or "resume").strip("_")[:60] or "resume"
+    return f"{title}-{resume_doc['$id']}.{kind}"
+
+async def render_artifact(resume_doc: Dict, kind: str, template: str) -> bytes:
+    try:
+        return await render_pool.render(resume_fields(resume_doc, template), kind, template)
+    except RenderQueueFull:
+        raise HTTPException(status_code=503, detail="Too many documents being rendered, try again shortly", headers={"Retry-After": "1"})
+    except RenderTimeout:
+        raise HTTPException(status_code=504, detail="Rendering the document took too long")
+
+def artifact_headers(key: str) -> Dict[str, str]:
+    # Clients may keep the file but must revalidate; a matching ETag costs a 304.
+    return {"ETag": f'"{key}"', "Cache-Control": "private, no-cache"}
+
+def build_resume_input(data: ResumeInputSchema | ResumeBatchInputSchema, user_info: Dict) -> Dict:
     input_data = data.model_dump()
     input_data.update({
         "basics": {
@@ -42,94 +65,374 @@ def generate_resume(data: ResumeInputSchema, current_user: Dict = Depends(authen
     if user_info['github']:
         input_data['basics']['github'] = user_info['github']
 
-    resume = ResumeGenerator.generate_resume(input_data)
+    return input_data
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def run_generation_job(job: Dict) -> Dict:
+    payload = job['payload']
+    resume = await ResumeGenerator.agenerate_resume(payload['input_data'], user_id=job['user_id'], use_cache=payload['use_cache'])
+    resume['user_id'] = job['user_id']
+    resume['template'] = payload['input_data']['template']
+    cached = resume.pop('cached', False)
+
+    if resume.get('error'):
+        raise RuntimeError(resume['error'])
+
+    cv = await create_resume(resume, settings.APPWRITE_DATABASE_ID, settings.APPWRITE_CV_COLLECTION_ID, job['user_id'])
+    if not cv:
+        raise RuntimeError("Failed to save the generated resume")
+
+    return {**ResumeOutputSchema(**resume, cached=cached).model_dump(), "resume_id": cv['$id']}
+
+generation_jobs = JobQueue(
+    make_job_store(settings.JOB_BACKEND, settings.JOB_DB_PATH),
+    run_generation_job,
+    workers=settings.JOB_WORKERS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+    retry_base_delay=settings.JOB_RETRY_BASE_DELAY,
+    retry_max_delay=settings.JOB_RETRY_MAX_DELAY
+)
+
+rendered_artifacts = ArtifactCache(settings.ARTIFACT_CACHE_DIR, settings.ARTIFACT_CACHE_MAX_BYTES)
+
+def make_job_response(job: Dict) -> ResumeJobSchema:
+    return ResumeJobSchema(
+        job_id=job['id'],
+        status=job['status'],
+        attempts=job['attempts'],
+        result=job['result'],
+        error=job['error'] if job['status'] == FAILED else None,
+        created_at=datetime.fromtimestamp(job['created_at'], timezone.utc),
+        updated_at=datetime.fromtimestamp(job['updated_at'], timezone.utc)
+    )
+
+@router.post('/resume/create', response_model=ResumeOutputSchema | ResumeJobSchema)
+async def generate_resume(
+    data: ResumeInputSchema,
+    response: Response,
+    cache: bool = True,
+    background: bool = False,
+    current_user: Dict = Depends(authenticate_user)
+):
+    log.debug("Generating resume", user_id=current_user['userId'], template=data.template, background=background, sample=True)
+    user = await get_user_profile(current_user['userId'], sections=["profile"])
+    if not user or not user.get('profile'):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    input_data = build_resume_input(data, user['profile'])
+
+    if background:
+        job = await generation_jobs.submit(current_user['userId'], {"input_data": input_data, "use_cache": cache})
+        response.status_code = 202
+        return make_job_response(job)
+
+    resume = await ResumeGenerator.agenerate_resume(input_data, user_id=current_user['userId'], use_cache=cache)
     resume['user_id'] = current_user['userId']
+    resume['template'] = data.template
+    cached = resume.pop('cached', False)
     
-    if resume and resume['error'] != '':
+    if resume and resume.get('error'):
         return ResumeOutputSchema(**resume)
     
-    create_resume(resume, settings.APPWRITE_DATABASE_ID, settings.APPWRITE_CV_COLLECTION_ID, current_user['userId'])
+    await create_resume(resume, settings.APPWRITE_DATABASE_ID, settings.APPWRITE_CV_COLLECTION_ID, current_user['userId'])
     
-    return ResumeOutputSchema(**resume)
+    return ResumeOutputSchema(**resume, cached=cached)
+
+@router.post('/resume/create/batch', response_model=ResumeBatchOutputSchema)
+async def generate_resume_batch(data: ResumeBatchInputSchema, cache: bool = True, current_user: Dict = Depends(authenticate_user)):
+    """
+    Generate the same content in several templates: one profile fetch, concurrent
+    generations and a single bulk write of every successful resume.
+    """
+    user = await get_user_profile(current_user['userId'], sections=["profile"])
+    if not user or not user.get('profile'):
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    base_input = build_resume_input(data, user['profile'])
+    templates = base_input.pop('templates')
+
+    resumes = await asyncio.gather(*(
+        ResumeGenerator.agenerate_resume({**base_input, "template": template}, user_id=current_user['userId'], use_cache=cache)
+        for template in templates
+    ))
+
+    output = ResumeBatchOutputSchema()
+    generated = {}
+    for template, resume in zip(templates, resumes):
+        resume['user_id'] = current_user['userId']
+        resume['template'] = template
+        cached = resume.pop('cached', False)
+
+        if resume.get('error'):
+            output.errors[template] = resume['error']
+            continue
+
+        generated[template] = resume
+        output.resumes[template] = ResumeOutputSchema(**resume, cached=cached)
+
+    if generated:
+        saved = await create_resumes(list(generated.values()), settings.APPWRITE_DATABASE_ID, settings.APPWRITE_CV_COLLECTION_ID, current_user['userId'])
+        if saved is None:
+            for template in generated:
+                output.errors[template] = "Failed to save the generated resume"
+            output.resumes = {}
+
+    return output
+
+@router.post('/resume/create/stream')
+async def generate_resume_stream(data: ResumeInputSchema, cache: bool = True, current_user: Dict = Depends(authenticate_user)):
+    """
+    Server-Sent Events variant of ``/resume/create``.
+
+    Emits ``start`` immediately, then ``token`` events with partial text and a
+    ``section`` event whenever a section header is detected. Once the model is done
+    the parsed resume is saved and sent as ``done`` (or ``error`` on failure).
+    """
+    async def events():
+        yield sse_event("start", {"user_id": current_user['userId']})
+
+        user = await get_user_profile(current_user['userId'], sections=["profile"])
+        if not user or not user.get('profile'):
+            yield sse_event("error", {"error": "Profile not found"})
+            return
+
+        input_data = build_resume_input(data, user['profile'])
+
+        async for kind, payload in ResumeGenerator.stream_resume(input_data, user_id=current_user['userId'], use_cache=cache):
+            if kind == "token":
+                yield sse_event("token", {"text": payload})
+            elif kind == "section":
+                yield sse_event("section", {"section": payload})
+            else:
+                resume = payload
+                resume['user_id'] = current_user['userId']
+                resume['template'] = data.template
+                cached = resume.pop('cached', False)
+
+                if resume.get('error'):
+                    yield sse_event("error", ResumeOutputSchema(**resume).model_dump())
+                    return
+
+                await create_resume(resume, settings.APPWRITE_DATABASE_ID, settings.APPWRITE_CV_COLLECTION_ID, current_user['userId'])
+                yield sse_event("done", ResumeOutputSchema(**resume, cached=cached).model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get('/resume/jobs/{job_id}', response_model=ResumeJobSchema)
+async def get_generation_job(job_id: str, user: Dict = Depends(authenticate_user)):
+    job = await generation_jobs.get(job_id)
+
+    if not job or job['user_id'] != user['userId']:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return make_job_response(job)
+
+@router.get('/resume/queue')
+async def get_generation_queue(user: Dict = Depends(authenticate_user)):
+    """
+    How many of the caller's generations are waiting for an LLM slot. Users listed
+    in ``ADMIN_USER_IDS`` also get the service-wide scheduler, rate-limit, render,
+    token and logging stats.
+    """
+    queue = {"queued": generation_scheduler.queued(user['userId'])}
+    if user['userId'] not in settings.ADMIN_USER_IDS:
+        return queue
+
+    return {**queue, **generation_scheduler.stats(), "rate_limit": llm_limiter.stats(), "render": render_pool.stats(), "tokens": llm_usage.stats(), "logs": log_stats()}
 
 @router.get('/resumes')
-def get_resumes(user: Dict = Depends(authenticate_user)):
-    all_resumes = get_curricullum_vitae(user['userId'])
-    
-    if not all_resumes:
+async def get_resumes(limit: int = Query(25, ge=1, le=MAX_PAGE_SIZE), cursor: str | None = None, user: Dict = Depends(authenticate_user)):
+    """
+    A page of the user's resumes: id, title and timestamps only. Pass the returned
+    ``next_cursor`` as ``cursor`` for the next page; it is null on the last one.
+    """
+    page = await list_curricullum_vitae(user['userId'], limit=limit, cursor=cursor)
+
+    if page is None:
+        return {"error": "No resumes found"}
+
+    resumes = page["documents"]
+    if not resumes and not cursor:
         return {"error": "No resumes found"}
-    
-    if isinstance(all_resumes, dict) and "error" in all_resumes:
-        return all_resumes
-    
-    if len(all_resumes) > 0:
-        return {"success": True, "data": all_resumes}
-    
-    return all_resumes
+
+    return {
+        "success": True,
+        "data": resumes,
+        "total": page.get("total"),
+        "next_cursor": resumes[-1]["$id"] if len(resumes) == limit else None
+    }
 
     
 @router.get('/resume/get/{id}')
-def get_single_resume(id:str, user: Dict = Depends(authenticate_user)) ->dict:
-    cv = get_single_curricullum_vitae(user_id=user['user_id'], cv_id=id)
+async def get_single_resume(id:str, user: Dict = Depends(authenticate_user)) ->dict:
+    cv = await get_single_curricullum_vitae(user_id=user['userId'], cv_id=id)
     
-    if cv['error'] != '':
-        return {"success": False, "message": cv['error']}
-    
-    if len(cv) == 0:
+    if not cv:
         return {"success": False, "message": "No record found"}
 
+    if cv.get('error'):
+        return {"success": False, "message": cv['error']}
+
     return cv 
 
 @router.delete('/resuming/delete/{id}')
-def delete_resume(id):
-    res = delete_cv(settings.APPWRITE_DATABASE_ID, settings.APPWRITE_CV_COLLECTION_ID, id)
+async def delete_resume(id, user: Dict = Depends(authenticate_user)):
+    if not await get_single_curricullum_vitae(user['userId'], id):
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    res = await delete_cv(settings.APPWRITE_DATABASE_ID, settings.APPWRITE_CV_COLLECTION_ID, id, user_id=user['userId'])
     
     return res
 
 @router.get("/resume/pdf/{resume_id}")
-def download_resume_pdf(resume_id: str, user: Dict = Depends(authenticate_user)):
-    resume_doc = get_single_curricullum_vitae(user['userId'], resume_id)
+async def download_resume_pdf(resume_id: str, request: Request, template: str | None = None, user: Dict = Depends(authenticate_user)):
+    resume_doc = await get_single_curricullum_vitae(user['userId'], resume_id)
 
     if not resume_doc:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    resume_text = resume_doc.get("resume", "")
+    template = template or resume_doc.get("template") or "modern-2"
+    if template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {template}")
 
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
+    key = artifact_key(resume_doc, "pdf", template, RENDERER_VERSIONS["pdf"])
+    headers = {"Content-Disposition": "attachment; filename=resume.pdf", **artifact_headers(key)}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
 
-    text_object = c.beginText(40, height - 50)
-    for line in resume_text.split("\n"):
-        text_object.textLine(line)
-    c.drawText(text_object)
-    c.save()
+    data = await run_in_threadpool(rendered_artifacts.read, key)
+    if data is None:
+        data = await render_artifact(resume_doc, "pdf", template)
+        await run_in_threadpool(rendered_artifacts.put, key, data)
 
-    buffer.seek(0)
-    return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": "attachment; filename=resume.pdf"})
+    return Response(data, media_type="application/pdf", headers=headers)
 
 
 
 @router.get("/resume/word/{resume_id}")
-def download_resume_word(resume_id: str, user: Dict = Depends(authenticate_user)):
-    resume_doc = get_single_curricullum_vitae(user['userId'], resume_id)
+async def download_resume_word(resume_id: str, request: Request, user: Dict = Depends(authenticate_user)):
+    resume_doc = await get_single_curricullum_vitae(user['userId'], resume_id)
 
     if not resume_doc:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    resume_text = resume_doc.get("resume", "")
+    media_type = MEDIA_TYPES["docx"]
+    key = artifact_key(resume_doc, "docx", "", RENDERER_VERSIONS["docx"])
+    headers = {"Content-Disposition": f"attachment; filename=resume_{uuid.uuid4().hex}.docx", **artifact_headers(key)}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    data = await run_in_threadpool(rendered_artifacts.read, key)
+    if data is None:
+        data = await render_artifact(resume_doc, "docx", "modern-2")
+        await run_in_threadpool(rendered_artifacts.put, key, data)
+
+    return Response(data, media_type=media_type, headers=headers)
+
+async def stream_resume_zip(user_id: str, first_page: Dict, kinds: List[str], template: str):
+    """
+    Yield a ZIP of every resume of ``user_id`` in ``kinds`` as it is built.
+
+    Resumes are listed a page at a time with ``RESUME_LIST_FIELDS``, enough to find
+    a rendered file in ``rendered_artifacts`` and read it from disk. A resume that
+    has to be rendered is fetched whole only then, and rendered on the process pool.
+    At most two files per render worker are in flight ahead of the archive, so
+    memory stays bounded however many resumes there are.
+    """
+    archive = ZipStream()
+    pending = deque()
+    errors = []
+
+    async def render(fetch: asyncio.Future, kind: str) -> bytes:
+        resume_doc = await fetch
+        if resume_doc is None:
+            raise RuntimeError("Could not load the resume")
+        # Waits for a free slot instead of failing the export halfway through.
+        return await render_pool.render(resume_fields(resume_doc, template), kind, template, wait=True)
+
+    def shared_fetch(resume_id: str):
+        # Both kinds of one resume share the fetch, started only once one has to be rendered.
+        fetched = None
+
+        def fetch() -> asyncio.Future:
+            nonlocal fetched
+            if fetched is None:
+                fetched = asyncio.ensure_future(get_single_curricullum_vitae(user_id, resume_id))
+            return fetched
+        return fetch
+
+    async def cached_or_render(key: str, fetch, kind: str):
+        data = await run_in_threadpool(rendered_artifacts.read, key)
+        if data is not None:
+            return data, False
+        return await render(fetch(), kind), True
 
-    buffer = io.BytesIO()
-    doc = Document()
-    for line in resume_text.split("\n"):
-        if line.strip():
-            doc.add_paragraph(line)
-    doc.save(buffer)
+    async def write_next() -> bytes:
+        name, key, future = pending.popleft()
+        try:
+            data, rendered = await future
+        except Exception as e:
+            errors.append(f"{name}: {str(e) or type(e).__name__}")
+            return b""
 
-    buffer.seek(0)
+        if rendered:
+            await run_in_threadpool(rendered_artifacts.put, key, data)
+        return archive.add(name, data)
+
+    try:
+        page = first_page
+        while True:
+            for listed in page["documents"]:
+                fetch = shared_fetch(listed["$id"])
+                for kind in kinds:
+                    kind_template = template if kind == "pdf" else ""
+                    key = artifact_key(listed, kind, kind_template, RENDERER_VERSIONS[kind])
+                    future = asyncio.ensure_future(cached_or_render(key, fetch, kind))
+                    pending.append((export_name(listed, kind), key, future))
+
+                    while len(pending) >= 2 * settings.RENDER_WORKERS:
+                        yield await write_next()
+
+            if len(page["documents"]) < MAX_PAGE_SIZE:
+                break
+            page = await list_curricullum_vitae(user_id, limit=MAX_PAGE_SIZE, cursor=page["documents"][-1]["$id"])
+            if page is None:
+                errors.append("Could not list the remaining resumes")
+                break
+
+        while pending:
+            yield await write_next()
+
+        if errors:
+            yield archive.add("errors.txt", "\n".join(errors).encode())
+        yield archive.close()
+    finally:
+        # Client went away: drop the renders nobody will read.
+        for *_, future in pending:
+            future.cancel()
+
+@router.get('/resume/export')
+async def export_resumes(format: str = "pdf", template: str = "modern-2", user: Dict = Depends(authenticate_user)):
+    if format not in ("pdf", "docx", "both"):
+        raise HTTPException(status_code=400, detail="format must be pdf, docx or both")
+    if template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown template: {template}")
+
+    first_page = await list_curricullum_vitae(user['userId'], limit=MAX_PAGE_SIZE)
+    if first_page is None:
+        raise HTTPException(status_code=502, detail="Could not load resumes")
+
+    kinds = ["pdf", "docx"] if format == "both" else [format]
     return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f"attachment; filename=resume_{uuid.uuid4().hex}.docx"}
+        stream_resume_zip(user['userId'], first_page, kinds, template),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=resumes.zip"}
     )
-
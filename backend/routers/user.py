@@ -2,16 +2,18 @@ from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from fastapi.responses import JSONResponse
 from api.profile import check_profile_exists
 from schema.userschema import CreateUserSchema, UserLoginSchema, AuthResponse, ProfileSchema, ProfileInputSchema, ResetPasswordSchema
-from appwrite.services.users import Users
 from appwrite.services.account import Account
-from core.appwrite import get_account
-from models.userModel import create_user, update_users, get_user_profile
+from core.appwrite import get_account, get_gateway, AppwriteGateway
+from models.userModel import PROFILE_SECTIONS, create_user, update_users, get_user_profile
 from api.auth import authenticate_user
 from core.config import settings
-from core.appwrite import get_user_register
+from core.log import get_logger
+from starlette.concurrency import run_in_threadpool
 import jwt
 import datetime
 
+log = get_logger(__name__)
+
 router = APIRouter(
     prefix='/v1',
     tags=['users']
@@ -26,7 +28,7 @@ def make_response(success: bool, message: str, error: str | None = None, userInf
     )
 
 @router.post('/signup', response_model=AuthResponse)
-def register(user_data: CreateUserSchema, account: Account = Depends(get_account)):
+async def register(user_data: CreateUserSchema, account: Account = Depends(get_account)):
     name = user_data.name
     email = user_data.email
     password = user_data.password
@@ -36,7 +38,9 @@ def register(user_data: CreateUserSchema, account: Account = Depends(get_account
         raise HTTPException(status_code=400, detail="Passwords do not match")
             
     try: 
-        new_user = account.create(
+        # The Account SDK is blocking; keep it off the event loop.
+        new_user = await run_in_threadpool(
+            account.create,
             user_id="unique()",
             email=email,
             password=password,
@@ -44,7 +48,8 @@ def register(user_data: CreateUserSchema, account: Account = Depends(get_account
         )
         
         if new_user:
-            verification = account.create_verification(
+            verification = await run_in_threadpool(
+                account.create_verification,
                 url='http://localhost:5173/api/v1/verifyemail'
             )
         return make_response(success=True, message="You registered successfully", error=None, userInfo=dict(new_user))
@@ -52,19 +57,22 @@ def register(user_data: CreateUserSchema, account: Account = Depends(get_account
         return make_response(success=False, message="Registration failed", error=str(e), userInfo=None)
 
 @router.post("/login", response_model=AuthResponse)
-def login(
+async def login(
     userData: UserLoginSchema,
     account: Account = Depends(get_account),
-    users: Users = Depends(get_user_register),
+    users: AppwriteGateway = Depends(get_gateway),
 ):
-    user_session = account.create_email_password_session(
+    user_session = await run_in_threadpool(
+        account.create_email_password_session,
         email=userData.email,
         password=userData.password
     )
 
+    name = (await users.get_user(user_id=user_session['userId']))['name']
     payload = {
         "user_id": user_session['userId'],
         "email": user_session['providerUid'],
+        "name": name,
         "secret": user_session['secret'],
         "exp": datetime.datetime.now(datetime.UTC) + datetime.timedelta(hours=2)
     }
@@ -77,7 +85,7 @@ def login(
         userInfo={
             "id": user_session['userId'],
             "email": user_session['providerUid'],
-            "name": users.get(user_session['userId'])['name']
+            "name": name
         }
     )
 
@@ -95,10 +103,10 @@ def login(
     return response
 
 @router.post('/profile/create')
-def create_profile(data: ProfileInputSchema, current_user = Depends(authenticate_user)):
+async def create_profile(data: ProfileInputSchema, current_user = Depends(authenticate_user)):
 
     try:
-        existing = check_profile_exists(current_user['userId'])
+        existing = await check_profile_exists(current_user['userId'])
 
         profile_data = data.model_dump()
         profile_data.update({
@@ -108,7 +116,7 @@ def create_profile(data: ProfileInputSchema, current_user = Depends(authenticate
         })
         
         if existing[0] == False:  
-            user = create_user(
+            user = await create_user(
                 profile_data, 
                 settings.APPWRITE_DATABASE_ID, 
                 settings.APPWRITE_USER_COLLECTION_ID, 
@@ -117,7 +125,7 @@ def create_profile(data: ProfileInputSchema, current_user = Depends(authenticate
             
             res = "Profile created successfully"
         else: 
-            user = update_users(
+            user = await update_users(
                 settings.APPWRITE_DATABASE_ID, 
                 settings.APPWRITE_USER_COLLECTION_ID, 
                 existing[1],
@@ -157,16 +165,29 @@ def create_profile(data: ProfileInputSchema, current_user = Depends(authenticate
 
 
 @router.get('/profile/get')
-def get_resume(current_user = Depends(authenticate_user)):
+async def get_resume(sections: str | None = None, current_user = Depends(authenticate_user)):
+    requested = [section.strip() for section in sections.split(",") if section.strip()] if sections else None
+    unknown = [section for section in requested or [] if section not in PROFILE_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown profile sections: {', '.join(unknown)}. Allowed: {', '.join(PROFILE_SECTIONS)}"
+        )
+
     try:
-        existing = check_profile_exists(current_user['userId'])
+        existing = await check_profile_exists(current_user['userId'])
 
         if existing[0] == False:
             raise HTTPException(status_code=404, detail="Profile not found")
 
-        user = get_user_profile(current_user['userId'])
+        user = await get_user_profile(current_user['userId'], sections=requested)
+        if user is None:
+            # Every requested section failed.
+            raise HTTPException(status_code=502, detail="Could not load the profile")
 
         return user
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -182,7 +203,7 @@ def verify_email(userId: str, secret: str, account: Account = Depends(get_accoun
 def logout(response: Response, request: Request, account: Account = Depends(get_account)):
     try:
         cookies = request.cookies
-        print("Cookies received:", cookies)
+        log.debug("Logout", cookies=sorted(cookies), sample=True)
 
         access_token = cookies.get("access_token")
         if not access_token:
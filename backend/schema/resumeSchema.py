@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict, Optional, List
 from datetime import date, datetime
 
+TEMPLATES = ("modern-1", "modern-2", "modern-3")
+
 class ProfileSchema(BaseModel):
     userId: str
     name: str
@@ -73,6 +75,23 @@ class ResumeInputSchema(BaseModel):
     skills: str
     certifications: Optional[str]
     
+class ResumeBatchInputSchema(BaseModel):
+    title: str
+    templates: List[str] = Field(..., min_length=1)
+    education: str
+    experience: str
+    projects: str
+    skills: str
+    certifications: Optional[str]
+
+    @field_validator('templates')
+    def validate_templates(cls, val: List[str]) -> List[str]:
+        invalid = [template for template in val if template not in TEMPLATES]
+        if invalid:
+            raise ValueError(f"Unknown templates: {', '.join(invalid)}")
+
+        return list(dict.fromkeys(val))
+    
 class ResumeOutputSchema(BaseModel):
     title: Optional[str] = ''
     name: Optional[str] = ''
@@ -88,5 +107,17 @@ class ResumeOutputSchema(BaseModel):
     certifications: Optional[str|None] = None
     error: Optional[str] = ''
     user_id: str
+    cached: bool = False
 
-    
+class ResumeBatchOutputSchema(BaseModel):
+    resumes: Dict[str, ResumeOutputSchema] = {}
+    errors: Dict[str, str] = {}
+
+class ResumeJobSchema(BaseModel):
+    job_id: str
+    status: str = Field(..., pattern="^(queued|running|done|failed)$")
+    attempts: int = 0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime